@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+# Connections are per request under ASGI and cannot be reused
+# across requests, persistent ones would only pile up
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
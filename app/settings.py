@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_extensions",
     "rest_framework",
     "rest_framework_simplejwt",
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "service.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -90,12 +92,86 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
         "HOST": os.getenv("POSTGRES_HOST"),
+        "PORT": os.getenv("POSTGRES_PORT", ""),
         "NAME": os.getenv("POSTGRES_NAME"),
         "USER": os.getenv("POSTGRES_USER"),
-        "PASSWORD": os.getenv("POSTGRES_PASSWORD")
+        "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
+        # Seconds a connection is reused across requests; 0 closes it after
+        # every request. Reused connections are checked before each request.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Behind pgbouncer in transaction pooling mode consecutive transactions may
+# run on different server connections, so cursors cannot be kept open
+# across them. psycopg2 never prepares statements on the server, so
+# cursors are the only thing to turn off.
+if os.getenv("DB_PGBOUNCER"):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Read replicas as comma separated "host[:port]", with the credentials of
+# the primary. Safe requests to the service API read from one of them,
+# see service/replicas.py.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv("POSTGRES_REPLICAS", "").split(","))):
+    host, _, port = replica.strip().partition(":")
+    DATABASES[f"replica_{index}"] = dict(
+        DATABASES["default"],
+        HOST=host,
+        PORT=port or DATABASES["default"]["PORT"],
+        TEST={"MIRROR": "default"},
+    )
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+# Stand-in replica for the router tests, a second connection to the test
+# database. app.test_runner adds it under manage.py test; set DB_TEST_REPLICA
+# when running the tests otherwise.
+TEST_REPLICA_ALIAS = "replica"
+if os.getenv("DB_TEST_REPLICA"):
+    DATABASES[TEST_REPLICA_ALIAS] = dict(DATABASES["default"], TEST={"MIRROR": "default"})
+
+DATABASE_ROUTERS = ["service.replicas.ReplicaRouter"]
+
+# How long a user's reads stay on the primary after they write, to cover
+# replication lag. The cache must be shared by all workers in production.
+REPLICA_STICKY_WINDOW = timedelta(seconds=15)
+REPLICA_STICKY_CACHE = "default"
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalogue": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalogue",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+if os.getenv("CATALOGUE_CACHE_REDIS_URL"):
+    CACHES["catalogue"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CATALOGUE_CACHE_REDIS_URL"),
+    }
+
+CATALOGUE_CACHE_ALIAS = "catalogue"
+CATALOGUE_CACHE_TIMEOUT = 300
+
+# Throttle counts are only global when all processes share this cache
+THROTTLE_CACHE = "default"
+
+if os.getenv("THROTTLE_CACHE_REDIS_URL"):
+    CACHES["throttle"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("THROTTLE_CACHE_REDIS_URL"),
+    }
+    THROTTLE_CACHE = "throttle"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -138,6 +214,14 @@ STATIC_URL = "static/"
 MEDIA_ROOT = BASE_DIR / "media/"
 MEDIA_URL = "/media/"
 
+# Serve MEDIA_URL from Django, with far-future cache headers
+SERVE_MEDIA = DEBUG
+
+STORAGES = {
+    "default": {"BACKEND": "service.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -146,12 +230,16 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "service.throttling.SlidingWindowAnonThrottle",
+        "service.throttling.SlidingWindowUserThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "50/day", "user": "3000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "50/day",
+        "user": "3000/day",
+        "reservations": "30/min",
+    },
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.ClaimsJWTAuthentication',
     )
 }
 
@@ -170,4 +258,39 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.ClaimsTokenObtainPairSerializer",
 }
+
+# How long ClaimsJWTAuthentication trusts a user's cached is_active and
+# is_staff before checking them again
+USER_STATE_TTL = timedelta(seconds=30)
+USER_STATE_CACHE = "default"
+
+# Widths of the resized copies made of uploaded play images, and the
+# threads making them; 0 makes them in the request once it commits
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_WORKERS = 2
+
+SEAT_HOLD_BACKEND = "service.holds.DatabaseSeatHoldBackend"
+SEAT_HOLD_TTL = timedelta(minutes=10)
+
+# Per-request SQL query budgets checked by RequestMetricsMiddleware, keyed by
+# "ViewSet.action", URL name ("service:play-list") or viewset class name.
+# Exceeding a budget logs a warning, or fails the request when
+# QUERY_BUDGET_STRICT is set, as app.test_runner does under manage.py test.
+QUERY_BUDGETS = {
+    "ActorModelViewSet": 3,
+    "GenreModelViewSet": 3,
+    "PlayModelViewSet": 8,
+    "PlayModelViewSet.create": 16,
+    "PlayModelViewSet.update": 16,
+    "PlayModelViewSet.partial_update": 16,
+    "TheatreHallModelViewSet": 4,
+    "PerformanceModelViewSet": 8,
+    "TicketModelView": 4,
+    "ReservationModelView": 12,
+    "SeatHoldViewSet": 13,
+}
+QUERY_BUDGET_STRICT = bool(os.getenv("QUERY_BUDGET_STRICT"))
+
+TEST_RUNNER = "app.test_runner.TestRunner"
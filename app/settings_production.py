@@ -0,0 +1,29 @@
+"""
+Production settings profile.
+
+Use with DJANGO_SETTINGS_MODULE=app.settings_production. Everything not
+overridden here comes from app.settings and its environment variables.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from app.settings import *  # noqa: F401,F403
+from app.settings import DATABASES
+
+DEBUG = False
+
+# Tokens signed by one worker must verify in all of them
+SECRET_KEY = os.environ.get("SECRET_KEY")
+if not SECRET_KEY:
+    raise ImproperlyConfigured("SECRET_KEY must be set in production")
+
+ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+
+# Media is best served by the web server in front, see README
+SERVE_MEDIA = bool(os.getenv("SERVE_MEDIA"))
+
+# Keep connections for a minute instead of reconnecting on every request.
+# app/asgi.py turns this off, since async requests each get their own
+# connection which would otherwise be left open.
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
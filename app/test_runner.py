@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner that fails requests over their query budget and adds
+    the stand-in replica the router tests read from.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_STRICT = True
+
+        if settings.TEST_REPLICA_ALIAS not in settings.DATABASES:
+            settings.DATABASES[settings.TEST_REPLICA_ALIAS] = dict(
+                settings.DATABASES["default"], TEST={"MIRROR": "default"}
+            )
+            # The connection handler keeps this same dict once configured,
+            # so only the defaults of the new alias are missing
+            connections.configure_settings(settings.DATABASES)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ServiceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "service"
+
+    def ready(self):
+        import service.signals  # noqa: F401
+        # Importing it also hooks query counting into connections as they
+        # are opened
+        from service.middleware import install_serializer_timing
+        install_serializer_timing()
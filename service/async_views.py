@@ -0,0 +1,246 @@
+"""
+Async read endpoints for the busiest catalogue reads.
+
+DRF views are sync, so under ASGI every request to them is handed to a
+worker thread. These plain Django views use the async ORM instead. Items
+match the plays list, the performances list and the seat map of the DRF
+API; both lists are paged by cursor in the CursorPagination shape.
+
+Django 4.2 cannot prefetch during async iteration, so related names are
+read with explicit queries on the through tables.
+"""
+import base64
+import functools
+import json
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils import timezone
+from rest_framework.exceptions import APIException, NotFound, Throttled
+from rest_framework.settings import api_settings
+
+from service.filters import (
+    filter_by_related,
+    filter_performances,
+    keyset_after,
+    parse_ids,
+    parse_mode,
+)
+from service.images import image_srcset
+from service.listings import LISTING_FIELDS, listing_data
+from service.models import Performance, PerformanceListing, Play, Ticket
+from service.replicas import choose_replica, reading_from
+from service.seat_map import build_seat_bitmap, encode_seat_bitmap
+from user.authentication import ClaimsJWTAuthentication
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+async def authenticate(request):
+    """ClaimsJWTAuthentication with its cache and user lookup done async."""
+    authenticator = ClaimsJWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+
+    return await authenticator.aget_user(authenticator.get_validated_token(raw_token))
+
+
+def check_throttles(request):
+    for throttle in (throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES):
+        if not throttle.allow_request(request, None):
+            raise Throttled(throttle.wait())
+
+
+def api_view(view):
+    """
+    GET-only async view with the same JWT authentication, authenticated
+    read permission and throttles as the DRF catalogue views.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+
+        try:
+            request.user = await authenticate(request)
+            if request.user is None:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=401,
+                )
+
+            # Throttles and the sticky-primary check do cache I/O, which
+            # must not block the event loop
+            await sync_to_async(check_throttles)(request)
+            alias = await sync_to_async(choose_replica)(request.method, request.user)
+            with reading_from(alias):
+                return await view(request, *args, **kwargs)
+        except APIException as error:
+            return JsonResponse(
+                error.detail if isinstance(error.detail, dict) else {"detail": error.detail},
+                status=error.status_code,
+            )
+
+    return wrapper
+
+
+def page_size(request):
+    try:
+        size = int(request.GET["page_size"])
+    except (KeyError, ValueError):
+        return PAGE_SIZE
+
+    return min(size, MAX_PAGE_SIZE) if size > 0 else PAGE_SIZE
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, fields):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise NotFound("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise NotFound("Invalid cursor")
+
+    return values
+
+
+async def keyset_page(request, queryset, fields, cursor_values):
+    """
+    One page of rows in the ascending order of fields plus the URL of the
+    next page, in the {"next", "results"} shape of CursorPagination.
+    """
+    size = page_size(request)
+
+    if request.GET.get("cursor"):
+        values = decode_cursor(request.GET["cursor"], fields)
+        queryset = queryset.filter(keyset_after(fields, values))
+
+    try:
+        rows = [row async for row in queryset.order_by(*fields)[:size + 1]]
+    except DjangoValidationError:
+        raise NotFound("Invalid cursor")
+
+    next_url = None
+    if len(rows) > size:
+        rows = rows[:size]
+        params = request.GET.copy()
+        params["cursor"] = encode_cursor(cursor_values(rows[-1]))
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+    return rows, next_url
+
+
+@api_view
+async def play_list(request):
+    queryset = Play.objects.all()
+    params = request.GET
+
+    if params.get("actors"):
+        queryset = filter_by_related(
+            queryset,
+            Play.actors.through,
+            "play_id",
+            "actor_id",
+            parse_ids(params["actors"], "actors"),
+            parse_mode(params.get("actors_mode"), "actors_mode"),
+        )
+
+    if params.get("genres"):
+        queryset = filter_by_related(
+            queryset,
+            Play.genres.through,
+            "play_id",
+            "genre_id",
+            parse_ids(params["genres"], "genres"),
+            parse_mode(params.get("genres_mode"), "genres_mode"),
+        )
+
+    plays, next_url = await keyset_page(
+        request,
+        queryset.values("id", "title", "description", "runtime", "image", "image_variants"),
+        ("id",),
+        lambda play: [play["id"]],
+    )
+    play_ids = [play["id"] for play in plays]
+
+    actors = defaultdict(list)
+    async for play_id, first_name, last_name in (
+        Play.actors.through.objects.filter(play_id__in=play_ids)
+        .order_by("id")
+        .values_list("play_id", "actor__first_name", "actor__last_name")
+    ):
+        actors[play_id].append(f"{first_name} {last_name}")
+
+    genres = defaultdict(list)
+    async for play_id, name in (
+        Play.genres.through.objects.filter(play_id__in=play_ids)
+        .order_by("id")
+        .values_list("play_id", "genre__name")
+    ):
+        genres[play_id].append(name)
+
+    return JsonResponse({
+        "next": next_url,
+        "results": [
+            dict(
+                play,
+                actors=actors[play["id"]],
+                genres=genres[play["id"]],
+                image=request.build_absolute_uri(default_storage.url(play["image"]))
+                if play["image"] else None,
+                image_srcset=image_srcset(play.pop("image_variants"), request),
+            )
+            for play in plays
+        ],
+    })
+
+
+@api_view
+async def performance_list(request):
+    performances, next_url = await keyset_page(
+        request,
+        filter_performances(PerformanceListing.objects.values(*LISTING_FIELDS), request.GET),
+        ("show_time", "id"),
+        lambda performance: [performance["show_time"].isoformat(), performance["id"]],
+    )
+
+    return JsonResponse({
+        "next": next_url,
+        "results": [listing_data(performance) for performance in performances],
+    })
+
+
+@api_view
+async def performance_seat_map(request, pk):
+    try:
+        performance = await Performance.objects.select_related("theatre_hall").aget(pk=pk)
+    except Performance.DoesNotExist:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    theatre_hall = performance.theatre_hall
+    taken_seats = [
+        seat async for seat in Ticket.objects.filter(
+            performance_id=performance.id
+        ).values_list("row", "seat")
+    ]
+
+    return JsonResponse({
+        "id": performance.id,
+        "rows": theatre_hall.rows,
+        "seats_in_row": theatre_hall.seats_in_row,
+        "encoding": "base64",
+        "seat_map": encode_seat_bitmap(
+            build_seat_bitmap(theatre_hall.rows, theatre_hall.seats_in_row, taken_seats)
+        ),
+    })
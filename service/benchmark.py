@@ -0,0 +1,463 @@
+import json
+import math
+import pickle
+import platform
+import re
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from service.models import Actor, Play, Performance
+from service.throttling import SlidingWindowThrottle, local_tier
+
+Scenario = namedtuple("Scenario", ["name", "method", "path", "data", "authenticated"])
+Response = namedtuple("Response", ["status", "queries"])
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def scenario(name, path, method="GET", data=None, authenticated=True):
+    return Scenario(name, method, path, data, authenticated)
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def queries_from_server_timing(header):
+    match = SERVER_TIMING_QUERIES.search(header or "")
+    return int(match.group(1)) if match else None
+
+
+def default_scenarios(email, password):
+    """
+    Read-heavy endpoints of service/urls.py and user/urls.py, pointed at
+    real rows of the seeded dataset.
+    """
+    play = Play.objects.order_by("id").first()
+    actor = Actor.objects.order_by("id").first()
+    performance = Performance.objects.order_by("-tickets_sold", "id").first()
+    refresh = str(RefreshToken.for_user(get_user_model().objects.get(email=email)))
+
+    scenarios = [
+        scenario("genres", reverse("service:genre-list")),
+        scenario("actors", reverse("service:actor-list")),
+        scenario("theatre halls", reverse("service:theatrehall-list")),
+        scenario("plays", reverse("service:play-list")),
+        scenario("performances", reverse("service:performance-list")),
+        scenario("reservations", reverse("service:reservation-list")),
+        scenario("tickets", reverse("service:ticket-list")),
+        scenario("token", reverse("user:token_obtain_pair"), "POST",
+                 {"email": email, "password": password}, authenticated=False),
+        scenario("token refresh", reverse("user:token_refresh"), "POST",
+                 {"refresh": refresh}, authenticated=False),
+    ]
+    if play:
+        scenarios += [
+            scenario("play detail", reverse("service:play-detail", args=[play.id])),
+            scenario("play search", reverse("service:play-list") + f"?q={play.title.split()[0]}"),
+        ]
+    if actor:
+        scenarios.append(
+            scenario("plays by actor", reverse("service:play-list") + f"?actors={actor.id}")
+        )
+    if performance:
+        scenarios += [
+            scenario("performance detail", reverse("service:performance-detail", args=[performance.id])),
+            scenario("seat map", reverse("service:performance-seat-map", args=[performance.id])),
+        ]
+
+    return scenarios
+
+
+def server_scenarios():
+    """
+    Pairs of equivalent DRF and async endpoints, as (name, sync, async),
+    for comparing the WSGI and ASGI servers.
+    """
+    actor = Actor.objects.order_by("id").first()
+    performance = Performance.objects.order_by("-tickets_sold", "id").first()
+
+    pairs = [(
+        "performances",
+        scenario("performances", reverse("service:performance-list")),
+        scenario("performances async", reverse("service:async-performance-list")),
+    )]
+    if actor:
+        # The plain DRF plays list is unpaginated, so compare a filtered one
+        pairs.append((
+            "plays by actor",
+            scenario("plays by actor", reverse("service:play-list") + f"?actors={actor.id}"),
+            scenario(
+                "plays by actor async",
+                reverse("service:async-play-list") + f"?actors={actor.id}",
+            ),
+        ))
+    if performance:
+        pairs.append((
+            "seat map",
+            scenario("seat map", reverse("service:performance-seat-map", args=[performance.id])),
+            scenario(
+                "seat map async",
+                reverse("service:async-performance-seat-map", args=[performance.id]),
+            ),
+        ))
+
+    return pairs
+
+
+class ClientTransport:
+    """
+    In-process requests through the Django test client. Memory is traced
+    with tracemalloc since the view code runs in this process.
+    """
+    traces_memory = True
+
+    def __init__(self, email):
+        user = get_user_model().objects.get(email=email)
+        self.token = str(RefreshToken.for_user(user).access_token)
+        # "testserver" is only allowed under the test runner
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        self.client = APIClient(SERVER_NAME=hosts[0].lstrip(".") if hosts else "localhost")
+
+    def prepare(self):
+        # The benchmark would otherwise trip the daily user throttle
+        caches[settings.THROTTLE_CACHE].clear()
+        local_tier.clear()
+
+    def request(self, item):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.token}"} if item.authenticated else {}
+        response = self.client.generic(
+            item.method,
+            item.path,
+            json.dumps(item.data) if item.data is not None else "",
+            content_type="application/json",
+            **headers,
+        )
+        return Response(response.status_code, queries_from_server_timing(response.get("Server-Timing")))
+
+
+class HttpTransport:
+    """Requests over real HTTP against a running server."""
+    traces_memory = False
+
+    def __init__(self, base_url, email=None, password=None, token=None):
+        self.base_url = base_url.rstrip("/")
+        # A token minted locally spares the anon-throttled token endpoint
+        self.token = token or self._post_json(reverse("user:token_obtain_pair"), {
+            "email": email,
+            "password": password,
+        })["access"]
+
+    def _post_json(self, path, data):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(data).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def prepare(self):
+        pass
+
+    def request(self, item):
+        headers = {"Content-Type": "application/json"}
+        if item.authenticated:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        request = urllib.request.Request(
+            self.base_url + item.path,
+            data=json.dumps(item.data).encode() if item.data is not None else None,
+            headers=headers,
+            method=item.method,
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return Response(response.status, queries_from_server_timing(response.headers.get("Server-Timing")))
+        except urllib.error.HTTPError as error:
+            error.read()
+            return Response(error.code, queries_from_server_timing(error.headers.get("Server-Timing")))
+
+
+def run_scenario(transport, item, iterations, warmup):
+    for _ in range(warmup):
+        transport.prepare()
+        transport.request(item)
+
+    timings = []
+    queries = []
+    statuses = {}
+
+    for _ in range(iterations):
+        transport.prepare()
+        started = time.perf_counter()
+        response = transport.request(item)
+        timings.append((time.perf_counter() - started) * 1000)
+
+        statuses[str(response.status)] = statuses.get(str(response.status), 0) + 1
+        if response.queries is not None:
+            queries.append(response.queries)
+
+    peak_memory = None
+    if transport.traces_memory:
+        # Traced separately, tracemalloc would inflate the timings above
+        transport.prepare()
+        tracemalloc.start()
+        transport.request(item)
+        peak_memory = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+
+    return {
+        "method": item.method,
+        "path": item.path,
+        "iterations": iterations,
+        "statuses": statuses,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": max(queries) if queries else None,
+        "peak_memory_kb": peak_memory,
+    }
+
+
+def run_concurrent(transports, item, requests):
+    """
+    Send item requests times in total, spread over one thread per
+    transport that all start together, and measure overall throughput.
+    """
+    barrier = threading.Barrier(len(transports))
+    per_transport = max(1, requests // len(transports))
+
+    def work(transport):
+        barrier.wait()
+        started = time.perf_counter()
+        timings = []
+        statuses = []
+
+        for _ in range(per_transport):
+            request_started = time.perf_counter()
+            statuses.append(transport.request(item).status)
+            timings.append((time.perf_counter() - request_started) * 1000)
+
+        return started, time.perf_counter(), timings, statuses
+
+    with ThreadPoolExecutor(len(transports)) as pool:
+        runs = list(pool.map(work, transports))
+
+    elapsed = max(run[1] for run in runs) - min(run[0] for run in runs)
+    timings = [timing for run in runs for timing in run[2]]
+    statuses = {}
+    for run in runs:
+        for response_status in run[3]:
+            statuses[str(response_status)] = statuses.get(str(response_status), 0) + 1
+
+    return {
+        "path": item.path,
+        "concurrency": len(transports),
+        "requests": len(timings),
+        "statuses": statuses,
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+    }
+
+
+CONNECTION_PROFILES = {
+    "new connection per request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": False},
+    "persistent with health checks": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+}
+
+
+def run_connection_benchmark(transport, scenarios, iterations, connects=20):
+    """
+    Per-request latency of scenarios under each of CONNECTION_PROFILES,
+    with the number of connections opened, and the average cost of opening
+    one.
+
+    The test client keeps its connection for its whole life, so the
+    close_old_connections() calls the real handlers make when a request
+    starts and finishes are made around every request here. Must run
+    outside a transaction, which would keep the connection open.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    original = {key: connection.settings_dict[key] for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+    opened = []
+
+    def count_connection(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    connect_timings = []
+    for _ in range(connects):
+        connection.close()
+        started = time.perf_counter()
+        connection.ensure_connection()
+        connect_timings.append((time.perf_counter() - started) * 1000)
+
+    results = {"connect_ms": round(statistics.fmean(connect_timings), 3), "profiles": {}}
+    connection_created.connect(count_connection)
+    try:
+        for name, profile in CONNECTION_PROFILES.items():
+            connection.close()
+            connection.settings_dict.update(profile)
+            opened.clear()
+            timings = {item.name: [] for item in scenarios}
+
+            for item in scenarios:
+                for _ in range(iterations):
+                    transport.prepare()
+                    started = time.perf_counter()
+                    close_old_connections()
+                    transport.request(item)
+                    close_old_connections()
+                    timings[item.name].append((time.perf_counter() - started) * 1000)
+
+            results["profiles"][name] = {
+                "connections": len(opened),
+                "scenarios": {
+                    scenario_name: {
+                        "p50_ms": round(percentile(samples, 50), 3),
+                        "mean_ms": round(statistics.fmean(samples), 3),
+                    }
+                    for scenario_name, samples in timings.items()
+                },
+            }
+    finally:
+        connection_created.disconnect(count_connection)
+        connection.settings_dict.update(original)
+        connection.close()
+
+    return results
+
+
+def run_throttle_benchmark(throttle_classes, calls, histories):
+    """
+    Time allow_request() of each throttle class for one client that already
+    made each of histories requests in the window, with the size of what
+    the throttle keeps in the cache for that client.
+
+    Rates are set high enough that every timed call is allowed, so each one
+    pays for recording a request.
+    """
+    factory = APIRequestFactory()
+    user_model = get_user_model()
+    results = {}
+
+    for throttle_class in throttle_classes:
+        runs = {}
+        for history in histories:
+            throttle_type = type(
+                throttle_class.__name__, (throttle_class, ), {"rate": f"{history + calls}/day"}
+            )
+            throttle = throttle_type()
+            cache = throttle.cache
+            cache.clear()
+            local_tier.clear()
+
+            request = Request(factory.get("/"))
+            request.user = user_model(pk=history + 1)
+            for _ in range(history):
+                throttle.allow_request(request, None)
+
+            timings = []
+            for _ in range(calls):
+                started = time.perf_counter()
+                allowed = throttle.allow_request(request, None)
+                timings.append((time.perf_counter() - started) * 1_000_000)
+                if not allowed:
+                    raise RuntimeError(f"{throttle_class.__name__} refused a request within its rate")
+
+            keys = [throttle.key]
+            if isinstance(throttle, SlidingWindowThrottle):
+                window = int(throttle.now // throttle.duration)
+                keys = [throttle.window_key(window - 1), throttle.window_key(window)]
+            runs[str(history)] = {
+                "mean_us": round(statistics.fmean(timings), 2),
+                "p95_us": round(percentile(timings, 95), 2),
+                "cache_bytes": len(pickle.dumps(list(cache.get_many(keys).values()))),
+            }
+        results[f"{throttle_class.__module__}.{throttle_class.__name__}"] = runs
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(transport, scenarios, iterations, warmup=3, mode=None):
+    """
+    Latencies from client and http mode are not comparable with each other,
+    compare results only between runs of the same mode.
+    """
+    return {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "mode": mode,
+        "python": platform.python_version(),
+        "scenarios": {
+            item.name: run_scenario(transport, item, iterations, warmup)
+            for item in scenarios
+        },
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Describe scenarios whose p95 grew by more than tolerance (a fraction) or
+    whose query count went up compared to a previous run.
+    """
+    regressions = []
+
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if (
+            current["queries"] is not None
+            and previous["queries"] is not None
+            and current["queries"] > previous["queries"]
+        ):
+            regressions.append(
+                f"{name}: queries {previous['queries']} -> {current['queries']}"
+            )
+
+    return regressions
@@ -0,0 +1,128 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from service.counters import adjust_tickets_sold
+from service.models import Performance, Ticket
+
+UNIQUE_SEAT_MESSAGE = "The fields row, seat, performance must make a unique set."
+HELD_SEAT_MESSAGE = "This seat is held by another customer."
+UNIQUE_SEAT_CONSTRAINT = "unique_ticket_seat_performance"
+
+
+def is_seat_taken(error):
+    """Whether an IntegrityError was raised by the unique seat constraint."""
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == UNIQUE_SEAT_CONSTRAINT
+
+
+def load_performances(performance_ids):
+    return Performance.objects.select_related("theatre_hall").in_bulk(
+        set(performance_ids)
+    )
+
+
+def validate_seats(tickets_data, performances, error_to_raise):
+    """
+    Validate requested seats in memory against already loaded performances.
+
+    Returns one error dict per ticket (empty when the ticket is valid), in
+    the same shape a ListSerializer reports nested errors.
+    """
+    errors = []
+    requested = set()
+
+    for ticket_data in tickets_data:
+        performance = performances.get(ticket_data["performance_id"])
+
+        if performance is None:
+            errors.append({
+                "performance": [
+                    f'Invalid pk "{ticket_data["performance_id"]}" - object does not exist.'
+                ]
+            })
+            continue
+
+        try:
+            Ticket.validate_range(
+                ticket_data["row"],
+                performance.theatre_hall.rows,
+                ticket_data["seat"],
+                performance.theatre_hall.seats_in_row,
+                error_to_raise
+            )
+        except error_to_raise as error:
+            errors.append(error.detail)
+            continue
+
+        seat = seat_key(ticket_data)
+        if seat in requested:
+            errors.append({"non_field_errors": [UNIQUE_SEAT_MESSAGE]})
+            continue
+
+        requested.add(seat)
+        errors.append({})
+
+    return errors
+
+
+def seat_key(ticket_data):
+    return ticket_data["performance_id"], ticket_data["row"], ticket_data["seat"]
+
+
+def find_taken_seats(tickets_data):
+    if not tickets_data:
+        return set()
+
+    query = reduce(or_, (
+        Q(performance_id=performance_id, row=row, seat=seat)
+        for performance_id, row, seat in map(seat_key, tickets_data)
+    ))
+
+    return set(
+        Ticket.objects.filter(query).values_list("performance_id", "row", "seat")
+    )
+
+
+def ticket_errors(tickets_data, error_to_raise, hold_backend=None, user_id=None):
+    """
+    Run the whole pipeline short of inserting: range checks, then one
+    query for sold seats and, if a hold backend is given, one lookup of
+    seats held by other users.
+    """
+    performances = load_performances(
+        ticket_data["performance_id"] for ticket_data in tickets_data
+    )
+    errors = validate_seats(tickets_data, performances, error_to_raise)
+    if any(errors):
+        return errors
+
+    taken_seats = find_taken_seats(tickets_data)
+    held = set()
+    if hold_backend is not None:
+        held = hold_backend.held_seats(
+            [seat_key(ticket_data) for ticket_data in tickets_data], exclude_user_id=user_id
+        )
+
+    return [
+        {"non_field_errors": [UNIQUE_SEAT_MESSAGE]} if seat_key(ticket_data) in taken_seats
+        else {"non_field_errors": [HELD_SEAT_MESSAGE]} if seat_key(ticket_data) in held
+        else {}
+        for ticket_data in tickets_data
+    ]
+
+
+def create_tickets(reservation, tickets_data):
+    tickets = Ticket.objects.bulk_create([
+        Ticket(reservation=reservation, **ticket_data)
+        for ticket_data in tickets_data
+    ])
+
+    # bulk_create bypasses post_save, so keep the counters in step here
+    sold = Counter(ticket.performance_id for ticket in tickets)
+    for performance_id, count in sold.items():
+        adjust_tickets_sold(performance_id, count)
+
+    return tickets
@@ -0,0 +1,93 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+def catalogue_cache():
+    return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+
+def _version_key(group):
+    return f"catalogue:version:{group}"
+
+
+def get_version(group):
+    cache = catalogue_cache()
+    key = _version_key(group)
+    version = cache.get(key)
+
+    if version is None:
+        # Start from the clock so an evicted counter can never come back at
+        # a value that still has stale responses cached under it
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(group):
+    cache = catalogue_cache()
+
+    try:
+        cache.incr(_version_key(group))
+    except ValueError:
+        cache.set(_version_key(group), time.time_ns(), None)
+
+
+def invalidate(*groups):
+    """
+    Bump the version of every group now and again once the transaction
+    commits, so a response rendered from uncommitted state is never kept.
+    """
+    for group in groups:
+        bump_version(group)
+        transaction.on_commit(lambda group=group: bump_version(group))
+
+
+def response_cache_key(request, view_name, action, groups, lookup):
+    versions = ":".join(f"{group}={get_version(group)}" for group in groups)
+    query = sorted(request.query_params.lists())
+    raw = f"{request.scheme}://{request.get_host()}{request.path}?{query}"
+
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"catalogue:response:{view_name}:{action}:{lookup}:{versions}:{digest}"
+
+
+class CachedCatalogueMixin:
+    """
+    Read-through cache for list and retrieve of catalogue viewsets.
+
+    Responses are cached per query string under the current version of each
+    group in cache_groups; signal receivers bump the versions on writes.
+    """
+    cache_groups = ()
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        cache = catalogue_cache()
+        key = response_cache_key(
+            request,
+            self.__class__.__name__,
+            self.action,
+            self.cache_groups,
+            kwargs.get(self.lookup_url_kwarg or self.lookup_field, "")
+        )
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.CATALOGUE_CACHE_TIMEOUT)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,85 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    ETag for list and retrieve, plus Last-Modified for retrieve, answered
+    with 304 before the body is serialized.
+
+    The stamp is the max of stamp_fields, plus the row count for lists so
+    deletions change it. It is read from the database, so every process
+    derives the same ETag whatever its local caches hold. Lists get no
+    Last-Modified: a date cannot tell that rows were removed.
+    """
+    stamp_fields = ()
+
+    def _list_stamp(self):
+        if not self.stamp_fields:
+            return None, ()
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        aggregates = {f"max_{index}": Max(field) for index, field in enumerate(self.stamp_fields)}
+        stamp = queryset.aggregate(count=Count("pk"), **aggregates)
+        timestamps = [stamp[key] for key in aggregates]
+
+        return timestamps, stamp["count"]
+
+    def _detail_stamp(self, lookup):
+        if not self.stamp_fields:
+            return None, ()
+
+        row = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: lookup})
+            .values_list(*self.stamp_fields)
+            .first()
+        )
+
+        return list(row or ()), ()
+
+    def _conditional_response(self, handler, request, *args, **kwargs):
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+
+        if self.action == "list":
+            timestamps, extra = self._list_stamp()
+        else:
+            timestamps, extra = self._detail_stamp(lookup)
+
+        timestamps = [timestamp for timestamp in timestamps or () if timestamp is not None]
+        last_modified = None
+        if timestamps and self.action != "list":
+            last_modified = int(max(timestamps).timestamp())
+
+        raw = repr((
+            self.__class__.__name__,
+            self.action,
+            lookup,
+            [timestamp.isoformat() for timestamp in timestamps],
+            extra,
+            sorted(request.query_params.lists()),
+        ))
+        etag = quote_etag(hashlib.md5(raw.encode("utf-8")).hexdigest())
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(super().retrieve, request, *args, **kwargs)
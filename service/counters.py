@@ -0,0 +1,42 @@
+from django.db.models import Count, F
+from django.utils import timezone
+
+from service.listings import adjust_listing_tickets, refresh_listings
+from service.models import Performance, Ticket
+
+
+def adjust_tickets_sold(performance_id, delta):
+    now = timezone.now()
+    Performance.objects.filter(id=performance_id).update(
+        tickets_sold=F("tickets_sold") + delta, updated_at=now
+    )
+    adjust_listing_tickets(performance_id, delta, now)
+
+
+def stale_tickets_sold():
+    """Return (performance_id, stored, actual) for every out-of-sync counter."""
+    actual = dict(
+        Ticket.objects.values("performance_id")
+        .annotate(sold=Count("id"))
+        .values_list("performance_id", "sold")
+    )
+
+    return [
+        (performance_id, stored, actual.get(performance_id, 0))
+        for performance_id, stored in Performance.objects.values_list(
+            "id", "tickets_sold"
+        ).iterator()
+        if stored != actual.get(performance_id, 0)
+    ]
+
+
+def rebuild_tickets_sold():
+    stale = stale_tickets_sold()
+
+    for performance_id, _, sold in stale:
+        Performance.objects.filter(id=performance_id).update(
+            tickets_sold=sold, updated_at=timezone.now()
+        )
+    refresh_listings([performance_id for performance_id, _, _ in stale])
+
+    return stale
@@ -0,0 +1,148 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+MAX_FILTER_IDS = 100
+# Largest bigint; larger ids would fail in the database instead
+MAX_ID = 2 ** 63 - 1
+
+
+def parse_ids(value, name):
+    """Parse a comma-separated list of positive integer ids from a query param."""
+    ids = []
+
+    for part in value.split(","):
+        part = part.strip()
+        # isdigit() alone also accepts characters such as "²"
+        try:
+            id_ = int(part) if part.isascii() and part.isdigit() else 0
+        except ValueError:
+            id_ = 0
+        if not 0 < id_ <= MAX_ID:
+            raise ValidationError({name: f"Expected comma-separated positive integers, got {value!r}."})
+        ids.append(id_)
+
+    ids = sorted(set(ids))
+    if len(ids) > MAX_FILTER_IDS:
+        raise ValidationError({name: f"At most {MAX_FILTER_IDS} ids are allowed."})
+
+    return ids
+
+
+def parse_datetime_param(value, name):
+    """
+    Parse an ISO 8601 datetime or date query param; dates mean midnight
+    and naive values are in the current timezone.
+    """
+    if not value:
+        return None
+
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            parsed = datetime.combine(date, time.min) if date else None
+    except ValueError:
+        parsed = None
+
+    if parsed is None:
+        raise ValidationError({name: f"Expected an ISO 8601 date or datetime, got {value!r}."})
+
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def parse_day_param(value, name):
+    """Parse an ISO 8601 date query param into the [start, end) of that local day."""
+    date = None
+    try:
+        date = parse_date(value)
+    except ValueError:
+        pass
+
+    if date is None:
+        raise ValidationError({name: f"Expected an ISO 8601 date, got {value!r}."})
+
+    start = datetime.combine(date, time.min)
+    return timezone.make_aware(start), timezone.make_aware(start + timedelta(days=1))
+
+
+def parse_mode(value, name):
+    mode = (value or MATCH_ANY).lower()
+
+    if mode not in (MATCH_ANY, MATCH_ALL):
+        raise ValidationError({name: f"Expected '{MATCH_ANY}' or '{MATCH_ALL}', got {value!r}."})
+
+    return mode
+
+
+def filter_by_related(queryset, through, source_field, target_field, ids, mode):
+    """
+    Keep rows linked through an m2m table to any or all of ids.
+
+    Both modes run as a subquery on the through table, so rows are never
+    duplicated by the join and no distinct() is needed.
+    """
+    links = through.objects.filter(**{f"{target_field}__in": ids})
+
+    if mode == MATCH_ANY:
+        return queryset.filter(Exists(links.filter(**{source_field: OuterRef("pk")})))
+
+    matching = (
+        links.order_by()
+        .values(source_field)
+        .annotate(matched=Count(target_field, distinct=True))
+        .filter(matched=len(ids))
+        .values(source_field)
+    )
+    return queryset.filter(pk__in=matching)
+
+
+def keyset_after(fields, values):
+    """Condition for rows after values in the ascending order of fields."""
+    condition = Q(**{f"{fields[-1]}__gt": values[-1]})
+    for field, value in zip(reversed(fields[:-1]), reversed(values[:-1])):
+        condition = Q(**{f"{field}__gt": value}) | Q(**{field: value}) & condition
+
+    return condition
+
+
+def filter_performances(queryset, params):
+    """
+    Filter PerformanceListing rows by ?date or ?from/?to, ?play, ?hall and
+    ?available_only.
+
+    Upcoming shows are listed unless a window is given, so listings start
+    from now on the show_time indexes instead of the whole history.
+    """
+    if params.get("date"):
+        if params.get("from") or params.get("to"):
+            raise ValidationError({"date": "Use either date or from/to, not both."})
+        start, end = parse_day_param(params["date"], "date")
+    else:
+        start = parse_datetime_param(params.get("from"), "from")
+        end = parse_datetime_param(params.get("to"), "to")
+        if start is None and end is None:
+            start = timezone.now()
+        if start and end and start >= end:
+            raise ValidationError({"to": "Must be after from."})
+
+    if start:
+        queryset = queryset.filter(show_time__gte=start)
+    if end:
+        queryset = queryset.filter(show_time__lt=end)
+
+    if params.get("play"):
+        queryset = queryset.filter(play_id__in=parse_ids(params["play"], "play"))
+
+    if params.get("hall"):
+        queryset = queryset.filter(theatre_hall_id__in=parse_ids(params["hall"], "hall"))
+
+    if params.get("available_only") == "true":
+        queryset = queryset.filter(tickets_available__gt=0)
+
+    return queryset
@@ -0,0 +1,185 @@
+import threading
+import uuid
+from collections import namedtuple
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from service.booking import seat_key
+from service.models import SeatHold, HeldSeat
+
+
+# tickets is a list of {"performance_id", "row", "seat"} dicts, the same
+# shape the reservation serializers validate
+Hold = namedtuple("Hold", ("token", "user_id", "expires_at", "tickets"))
+
+
+HELD_SEAT_CONSTRAINT = "unique_held_seat_performance"
+
+
+def is_seat_held(error):
+    """Whether an IntegrityError was raised by the unique held seat constraint."""
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == HELD_SEAT_CONSTRAINT
+
+
+class SeatsUnavailable(Exception):
+    def __init__(self, seats):
+        super().__init__(f"{len(seats)} seats are already held")
+        self.seats = seats
+
+
+class DatabaseSeatHoldBackend:
+    """
+    Holds stored in the database.
+
+    A unique constraint on (row, seat, performance) of HeldSeat makes
+    claiming atomic; expired holds are purged lazily when their seats are
+    claimed again, or in bulk by the purge_seat_holds command.
+    """
+
+    @staticmethod
+    def _seats_query(seats):
+        return reduce(or_, (
+            Q(performance_id=performance_id, row=row, seat=seat)
+            for performance_id, row, seat in seats
+        ))
+
+    def claim(self, user_id, tickets, ttl):
+        now = timezone.now()
+        seats = [seat_key(ticket_data) for ticket_data in tickets]
+
+        try:
+            with transaction.atomic():
+                HeldSeat.objects.filter(
+                    self._seats_query(seats), hold__expires_at__lte=now
+                ).delete()
+
+                hold = SeatHold.objects.create(user_id=user_id, expires_at=now + ttl)
+                HeldSeat.objects.bulk_create([
+                    HeldSeat(hold=hold, **ticket_data) for ticket_data in tickets
+                ])
+        except IntegrityError as error:
+            if not is_seat_held(error):
+                raise
+            raise SeatsUnavailable(self.held_seats(seats, exclude_user_id=None))
+
+        return Hold(str(hold.token), user_id, hold.expires_at, list(tickets))
+
+    def get(self, token, user_id):
+        hold = SeatHold.objects.filter(
+            token=token, user_id=user_id, expires_at__gt=timezone.now()
+        ).first()
+
+        if hold is None:
+            return None
+
+        tickets = list(hold.seats.values("performance_id", "row", "seat"))
+        return Hold(str(hold.token), hold.user_id, hold.expires_at, tickets)
+
+    def release(self, token):
+        SeatHold.objects.filter(token=token).delete()
+
+    def held_seats(self, seats, exclude_user_id):
+        if not seats:
+            return set()
+
+        held = HeldSeat.objects.filter(
+            self._seats_query(seats), hold__expires_at__gt=timezone.now()
+        )
+        if exclude_user_id is not None:
+            held = held.exclude(hold__user_id=exclude_user_id)
+
+        return set(held.values_list("performance_id", "row", "seat"))
+
+    def purge_expired(self):
+        _, deleted = SeatHold.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted.get(SeatHold._meta.label, 0)
+
+
+class InMemorySeatHoldBackend:
+    """Process-local holds for tests and single-process development servers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holds = {}
+        self._seats = {}
+
+    def _drop(self, token):
+        hold = self._holds.pop(token, None)
+        if hold is not None:
+            for ticket_data in hold.tickets:
+                self._seats.pop(seat_key(ticket_data), None)
+
+    def _live_hold(self, seat, now):
+        hold = self._holds.get(self._seats.get(seat))
+        if hold is not None and hold.expires_at <= now:
+            self._drop(hold.token)
+            return None
+        return hold
+
+    def claim(self, user_id, tickets, ttl):
+        now = timezone.now()
+        seats = [seat_key(ticket_data) for ticket_data in tickets]
+
+        with self._lock:
+            taken = {seat for seat in seats if self._live_hold(seat, now)}
+            if taken:
+                raise SeatsUnavailable(taken)
+
+            hold = Hold(str(uuid.uuid4()), user_id, now + ttl, list(tickets))
+            self._holds[hold.token] = hold
+            for seat in seats:
+                self._seats[seat] = hold.token
+
+        return hold
+
+    def get(self, token, user_id):
+        with self._lock:
+            hold = self._holds.get(token)
+            if hold is None or hold.user_id != user_id:
+                return None
+            if hold.expires_at <= timezone.now():
+                self._drop(token)
+                return None
+            return hold
+
+    def release(self, token):
+        with self._lock:
+            self._drop(token)
+
+    def held_seats(self, seats, exclude_user_id):
+        now = timezone.now()
+
+        with self._lock:
+            return {
+                seat for seat in seats
+                if (hold := self._live_hold(seat, now)) is not None
+                and hold.user_id != exclude_user_id
+            }
+
+    def purge_expired(self):
+        now = timezone.now()
+
+        with self._lock:
+            expired = [
+                token for token, hold in self._holds.items() if hold.expires_at <= now
+            ]
+            for token in expired:
+                self._drop(token)
+
+        return len(expired)
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_hold_backend():
+    return _load_backend(settings.SEAT_HOLD_BACKEND)
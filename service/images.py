@@ -0,0 +1,168 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from service.cache import invalidate
+from service.models import Play
+
+# Pillow format, file extension and save() options of each variant format
+IMAGE_VARIANT_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+def variant_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f"{root}-{width}w.{extension}"
+
+
+def generate_variants(name, storage=default_storage):
+    """
+    Save resized copies of the image stored under name at each of
+    IMAGE_VARIANT_WIDTHS narrower than it, or at its own width when it is
+    narrower than all of them, in every IMAGE_VARIANT_FORMATS.
+
+    Returns {format: {width: stored name}}, widths as strings since the
+    map is stored as JSON.
+    """
+    with storage.open(name) as file, Image.open(file) as original:
+        # Phones store the orientation in EXIF, which the copies lose
+        image = ImageOps.exif_transpose(original)
+        widths = [width for width in settings.IMAGE_VARIANT_WIDTHS if width < image.width] or [image.width]
+        variants = {image_format: {} for image_format in IMAGE_VARIANT_FORMATS}
+
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            for image_format, (pillow_format, extension, options) in IMAGE_VARIANT_FORMATS.items():
+                copy = resized
+                if pillow_format == "JPEG" and copy.mode != "RGB":
+                    copy = copy.convert("RGB")
+
+                buffer = BytesIO()
+                copy.save(buffer, pillow_format, **options)
+                variants[image_format][str(width)] = storage.save(
+                    variant_name(name, width, extension), ContentFile(buffer.getvalue())
+                )
+
+    return variants
+
+
+def process_play_image(play_id, name):
+    variants = generate_variants(name)
+    # Skipped when another upload replaced the image meanwhile
+    updated = Play.objects.filter(pk=play_id, image=name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    if updated:
+        invalidate("plays")
+
+
+def _process_in_worker(play_id, name):
+    try:
+        process_play_image(play_id, name)
+    except Exception:
+        # Nobody waits on the future, the play keeps serving its original
+        logger.exception("Generating image variants of play %s failed", play_id)
+    finally:
+        close_old_connections()
+
+
+def image_pool():
+    global _pool
+
+    if _pool is None:
+        _pool = ThreadPoolExecutor(settings.IMAGE_WORKERS, thread_name_prefix="images")
+
+    return _pool
+
+
+def schedule_play_image(play):
+    """
+    Generate the variants of play's image once the upload commits, in the
+    image pool so the request does not wait for Pillow, or right away when
+    IMAGE_WORKERS is 0.
+    """
+    play_id, name = play.pk, play.image.name
+
+    if settings.IMAGE_WORKERS:
+        transaction.on_commit(lambda: image_pool().submit(_process_in_worker, play_id, name))
+    else:
+        transaction.on_commit(lambda: process_play_image(play_id, name))
+
+
+def save_play(serializer):
+    """Save a play serializer, generating variants when it sets a new image."""
+    if "image" not in serializer.validated_data:
+        return serializer.save()
+
+    play = serializer.save(image_variants={})
+    if play.image:
+        schedule_play_image(play)
+
+    return play
+
+
+def image_srcset(variants, request=None):
+    """
+    {format: srcset} of the variants, for <source> elements of a <picture>.
+    URLs are absolute with a request, as DRF makes those of file fields.
+    """
+    def url(name):
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return {
+        image_format: ", ".join(
+            f"{url(name)} {width}w"
+            for width, name in sorted(names.items(), key=lambda item: int(item[0]))
+        )
+        for image_format, names in variants.items()
+    }
+
+
+def referenced_media():
+    """Names of all stored files the database refers to."""
+    names = set()
+    for image, variants in Play.objects.exclude(image="").values_list("image", "image_variants"):
+        if image:
+            names.add(image)
+        for format_names in variants.values():
+            names.update(format_names.values())
+
+    return names
+
+
+def orphaned_media(directory, min_age, storage=default_storage):
+    """
+    Yield names of files under directory that nothing refers to and that
+    are older than min_age, which spares uploads whose rows are not
+    committed yet and variants still being generated.
+    """
+    referenced = referenced_media()
+    cutoff = timezone.now() - min_age
+    pending = [directory]
+
+    while pending:
+        current = pending.pop()
+        directories, files = storage.listdir(current)
+        pending += [os.path.join(current, name) for name in directories]
+
+        for filename in files:
+            name = os.path.join(current, filename)
+            if name not in referenced and storage.get_modified_time(name) < cutoff:
+                yield name
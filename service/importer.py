@@ -0,0 +1,302 @@
+import csv
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from service.cache import invalidate
+from service.listings import refresh_listings, update_hall_listings
+from service.models import Actor, Genre, Play, Performance, TheatreHall
+from service.scheduling import reschedule_play
+from service.search import actor_search_vector, play_search_vector
+
+LIST_SEPARATOR = ";"
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def read_rows(path):
+    """Yield dicts from a CSV or JSON-lines file without loading it whole."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in (".csv", ".jsonl", ".ndjson"):
+        raise ValueError(f"Unsupported file type {suffix!r}, expected .csv, .jsonl or .ndjson")
+
+    with open(path, newline="", encoding="utf-8") as file:
+        if suffix == ".csv":
+            yield from csv.DictReader(file)
+            return
+
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def split_names(value):
+    """CSV cells hold ";"-separated names, JSON lines may use a list."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR)
+    return [" ".join(name.split()) for name in value if name.strip()]
+
+
+def split_full_name(full_name):
+    """Split at the first space; the rest, possibly several words, is the last name."""
+    first_name, _, last_name = full_name.partition(" ")
+    if not last_name:
+        raise ImportRowError(f"Actor {full_name!r} needs a first and a last name")
+    return first_name, last_name.strip()
+
+
+def required(row, field):
+    value = row.get(field)
+    if value in (None, ""):
+        raise ImportRowError(f"{field} is required")
+    return value
+
+
+def optional_runtime(row):
+    """Runtime in minutes of a play row, None when the row has none."""
+    value = row.get("runtime")
+    if value in (None, ""):
+        return None
+    try:
+        runtime = int(value)
+    except (TypeError, ValueError):
+        runtime = 0
+    if runtime <= 0:
+        raise ImportRowError(f"Invalid runtime {value!r}")
+    return runtime
+
+
+def ensure_genres(names):
+    Genre.objects.bulk_create(
+        [Genre(name=name) for name in set(names)], ignore_conflicts=True
+    )
+    return dict(Genre.objects.filter(name__in=names).values_list("name", "id"))
+
+
+def ensure_actors(names):
+    """
+    Actors have no unique key to upsert on, so existing ones are looked up
+    by (first_name, last_name) and only the missing ones are inserted.
+    """
+    wanted = set(names)
+    existing = {}
+    for actor_id, first_name, last_name in Actor.objects.filter(
+        first_name__in={first for first, _ in wanted},
+        last_name__in={last for _, last in wanted},
+    ).order_by("id").values_list("id", "first_name", "last_name"):
+        existing.setdefault((first_name, last_name), actor_id)
+
+    missing = [
+        Actor(first_name=first_name, last_name=last_name)
+        for first_name, last_name in wanted - existing.keys()
+    ]
+    for actor in Actor.objects.bulk_create(missing):
+        existing[(actor.first_name, actor.last_name)] = actor.id
+
+    if missing:
+        Actor.objects.filter(id__in=[actor.id for actor in missing]).update(
+            search_vector=actor_search_vector()
+        )
+
+    return existing
+
+
+def import_genres(rows):
+    ensure_genres([required(row, "name") for row in rows])
+    return len(rows)
+
+
+def import_actors(rows):
+    ensure_actors([(required(row, "first_name"), required(row, "last_name")) for row in rows])
+    return len(rows)
+
+
+def import_theatre_halls(rows):
+    # One upsert cannot touch the same row twice, the last duplicate wins
+    halls = {
+        required(row, "name"): TheatreHall(
+            name=row["name"],
+            rows=int(required(row, "rows")),
+            seats_in_row=int(required(row, "seats_in_row")),
+        )
+        for row in rows
+    }
+    TheatreHall.objects.bulk_create(
+        list(halls.values()),
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["rows", "seats_in_row", "updated_at"],
+    )
+    # The upsert leaves pks unset and sends no signals
+    for hall in TheatreHall.objects.filter(name__in=halls):
+        update_hall_listings(hall)
+    return len(rows)
+
+
+def import_plays(rows):
+    """
+    Upsert plays on title, then add their actors and genres by name,
+    creating any that do not exist yet. Existing links are kept, as is the
+    runtime of plays whose row has none.
+    """
+    plays = {}
+    runtimes = {}
+    for row in rows:
+        plays[required(row, "title")] = row
+        runtimes[row["title"]] = optional_runtime(row)
+
+    previous_runtimes = dict(Play.objects.filter(title__in=plays).values_list("title", "runtime"))
+
+    # Rows without a runtime leave the stored one alone, new plays get the default
+    with_runtime, without_runtime = [], []
+    for title, row in plays.items():
+        play = Play(title=title, description=row.get("description") or "")
+        if runtimes[title] is None:
+            without_runtime.append(play)
+        else:
+            play.runtime = runtimes[title]
+            with_runtime.append(play)
+
+    for objs, update_fields in (
+        (with_runtime, ["description", "runtime", "updated_at"]),
+        (without_runtime, ["description", "updated_at"]),
+    ):
+        Play.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["title"],
+            update_fields=update_fields,
+        )
+    play_ids = dict(Play.objects.filter(title__in=plays).values_list("title", "id"))
+    Play.objects.filter(id__in=play_ids.values()).update(search_vector=play_search_vector())
+
+    # The upsert sends no signals, so performances are moved here
+    for title, runtime in runtimes.items():
+        if title in previous_runtimes and runtime is not None and runtime != previous_runtimes[title]:
+            refresh_listings(reschedule_play(Play(id=play_ids[title], runtime=runtime)))
+
+    actors = {
+        title: [split_full_name(name) for name in split_names(row.get("actors"))]
+        for title, row in plays.items()
+    }
+    genres = {title: split_names(row.get("genres")) for title, row in plays.items()}
+    actor_ids = ensure_actors([name for names in actors.values() for name in names])
+    genre_ids = ensure_genres([name for names in genres.values() for name in names])
+
+    Play.actors.through.objects.bulk_create(
+        [
+            Play.actors.through(play_id=play_ids[title], actor_id=actor_ids[name])
+            for title, names in actors.items()
+            for name in names
+        ],
+        ignore_conflicts=True,
+    )
+    Play.genres.through.objects.bulk_create(
+        [
+            Play.genres.through(play_id=play_ids[title], genre_id=genre_ids[name])
+            for title, names in genres.items()
+            for name in names
+        ],
+        ignore_conflicts=True,
+    )
+    return len(rows)
+
+
+def import_performances(rows):
+    """
+    Insert performances referring to plays by title and halls by name,
+    skipping ones already scheduled at the same time and place.
+    """
+    plays = {
+        title: (play_id, timedelta(minutes=runtime))
+        for title, play_id, runtime in Play.objects.filter(
+            title__in={row.get("play") for row in rows}
+        ).values_list("title", "id", "runtime")
+    }
+    hall_ids = dict(
+        TheatreHall.objects.filter(name__in={row.get("theatre_hall") for row in rows})
+        .values_list("name", "id")
+    )
+
+    performances = {}
+    for row in rows:
+        play_id, duration = plays.get(required(row, "play"), (None, None))
+        hall_id = hall_ids.get(required(row, "theatre_hall"))
+        show_time = parse_datetime(required(row, "show_time"))
+
+        if play_id is None:
+            raise ImportRowError(f"Play {row['play']!r} does not exist")
+        if hall_id is None:
+            raise ImportRowError(f"Theatre hall {row['theatre_hall']!r} does not exist")
+        if show_time is None:
+            raise ImportRowError(f"Invalid show_time {row['show_time']!r}")
+        if timezone.is_naive(show_time):
+            show_time = timezone.make_aware(show_time)
+
+        performances[(play_id, hall_id, show_time)] = Performance(
+            play_id=play_id,
+            theatre_hall_id=hall_id,
+            show_time=show_time,
+            ends_at=show_time + duration,
+        )
+
+    existing = set(
+        Performance.objects.filter(
+            play_id__in={play_id for play_id, _, _ in performances},
+            show_time__in={show_time for _, _, show_time in performances},
+        ).values_list("play_id", "theatre_hall_id", "show_time")
+    )
+    created = Performance.objects.bulk_create(
+        [performance for key, performance in performances.items() if key not in existing]
+    )
+    refresh_listings([performance.id for performance in created])
+    return len(rows)
+
+
+IMPORTERS = {
+    "genres": (import_genres, ("genres",)),
+    "actors": (import_actors, ("actors",)),
+    "theatre_halls": (import_theatre_halls, ("theatre_halls",)),
+    "plays": (import_plays, ("plays", "actors", "genres")),
+    "performances": (import_performances, ()),
+}
+
+
+def import_batch(kind, rows):
+    """
+    Import one batch in its own transaction. Bulk queries skip the model
+    signals, so search vectors are filled by the importers and the
+    catalogue cache is invalidated here.
+    """
+    importer, cache_groups = IMPORTERS[kind]
+
+    try:
+        with transaction.atomic():
+            count = importer(rows)
+            if cache_groups:
+                invalidate(*cache_groups)
+    except (IntegrityError, DataError) as error:
+        # e.g. a performance overlapping another one in the same hall, or a
+        # title longer than its column
+        raise ImportRowError(str(error).strip())
+
+    return count
@@ -0,0 +1,160 @@
+from django.db.models import F, Q
+from django.utils import timezone
+
+from service.models import Performance, PerformanceListing
+
+# Columns the performance list reads, see listing_data()
+LISTING_FIELDS = (
+    "id",
+    "show_time",
+    "ends_at",
+    "play_title",
+    "theatre_hall_name",
+    "num_of_seats",
+    "tickets_sold",
+    "tickets_available",
+    "updated_at",
+)
+
+REFRESHED_FIELDS = (
+    "show_time",
+    "ends_at",
+    "play_id",
+    "play_title",
+    "theatre_hall_id",
+    "theatre_hall_name",
+    "num_of_seats",
+    "tickets_sold",
+    "tickets_available",
+    "updated_at",
+    "refreshed_at",
+)
+
+
+def local_isoformat(value):
+    # Same format as DRF's DateTimeField
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+def listing_data(row):
+    """Performance list item from a dict of LISTING_FIELDS."""
+    return {
+        "id": row["id"],
+        "play": row["play_title"],
+        "theatre_hall": row["theatre_hall_name"],
+        "show_time": local_isoformat(row["show_time"]),
+        "ends_at": local_isoformat(row["ends_at"]),
+        "tickets_sold": row["tickets_sold"],
+        "updated_at": local_isoformat(row["updated_at"]),
+        "num_of_seats": row["num_of_seats"],
+        "tickets_available": row["tickets_available"],
+    }
+
+
+def refresh_listings(performance_ids):
+    """Recompute the listing rows of performances from their joins."""
+    now = timezone.now()
+    rows = Performance.objects.filter(id__in=performance_ids).annotate(
+        num_of_seats=F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+    ).values(
+        "id",
+        "show_time",
+        "ends_at",
+        "play_id",
+        "play__title",
+        "theatre_hall_id",
+        "theatre_hall__name",
+        "num_of_seats",
+        "tickets_sold",
+        "updated_at",
+    )
+
+    PerformanceListing.objects.bulk_create(
+        [
+            PerformanceListing(
+                id=row["id"],
+                show_time=row["show_time"],
+                ends_at=row["ends_at"],
+                play_id=row["play_id"],
+                play_title=row["play__title"],
+                theatre_hall_id=row["theatre_hall_id"],
+                theatre_hall_name=row["theatre_hall__name"],
+                num_of_seats=row["num_of_seats"],
+                tickets_sold=row["tickets_sold"],
+                tickets_available=row["num_of_seats"] - row["tickets_sold"],
+                updated_at=row["updated_at"],
+                refreshed_at=now,
+            )
+            for row in rows
+        ],
+        update_conflicts=True,
+        unique_fields=("id",),
+        update_fields=REFRESHED_FIELDS,
+    )
+
+
+def forget_listing(performance_id):
+    PerformanceListing.objects.filter(id=performance_id).delete()
+
+
+def adjust_listing_tickets(performance_id, delta, updated_at):
+    """Follow an adjust_tickets_sold() of the performance."""
+    PerformanceListing.objects.filter(id=performance_id).update(
+        tickets_sold=F("tickets_sold") + delta,
+        tickets_available=F("tickets_available") - delta,
+        updated_at=updated_at,
+        refreshed_at=updated_at,
+    )
+
+
+def rename_play_listings(play):
+    # Rows already showing the title are left alone, so saves that do
+    # not rename the play, such as image uploads, write nothing
+    PerformanceListing.objects.filter(play_id=play.pk).exclude(play_title=play.title).update(
+        play_title=play.title, refreshed_at=timezone.now()
+    )
+
+
+def update_hall_listings(theatre_hall):
+    num_of_seats = theatre_hall.num_of_seats
+    PerformanceListing.objects.filter(theatre_hall_id=theatre_hall.pk).exclude(
+        Q(theatre_hall_name=theatre_hall.name) & Q(num_of_seats=num_of_seats)
+    ).update(
+        theatre_hall_name=theatre_hall.name,
+        num_of_seats=num_of_seats,
+        tickets_available=num_of_seats - F("tickets_sold"),
+        refreshed_at=timezone.now(),
+    )
+
+
+def stale_listings():
+    """Ids of performances whose listing row is missing or out of date, and of orphan rows."""
+    num_of_seats = F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+    expected = {
+        row["id"]: row for row in Performance.objects.annotate(
+            num_of_seats=num_of_seats,
+            tickets_available=num_of_seats - F("tickets_sold"),
+            play_title=F("play__title"),
+            theatre_hall_name=F("theatre_hall__name"),
+        ).values("id", *REFRESHED_FIELDS[:-1]).iterator()
+    }
+
+    stale, orphans = [], []
+    for row in PerformanceListing.objects.values("id", *REFRESHED_FIELDS[:-1]).iterator():
+        if row["id"] not in expected:
+            orphans.append(row["id"])
+        elif expected.pop(row["id"]) != row:
+            stale.append(row["id"])
+
+    return stale + list(expected), orphans
+
+
+def rebuild_listings(batch_size=1000):
+    stale, orphans = stale_listings()
+
+    for start in range(0, len(stale), batch_size):
+        refresh_listings(stale[start:start + batch_size])
+    PerformanceListing.objects.filter(id__in=orphans).delete()
+
+    return stale, orphans
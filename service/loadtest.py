@@ -0,0 +1,122 @@
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.db.models import Count
+from django.urls import reverse
+
+from service.benchmark import percentile, scenario
+from service.models import Ticket
+
+
+def overlapping_seat_sets(theatre_hall, requests, seats_per_request, hot_seats, rng):
+    """
+    Seat sets drawn from the first hot_seats seats of the hall, so the
+    fewer hot seats there are, the more requests collide.
+    """
+    hot_seats = min(hot_seats, theatre_hall.rows * theatre_hall.seats_in_row)
+    seats_per_request = min(seats_per_request, hot_seats)
+
+    return [
+        [
+            (index // theatre_hall.seats_in_row + 1, index % theatre_hall.seats_in_row + 1)
+            for index in rng.sample(range(hot_seats), seats_per_request)
+        ]
+        for _ in range(requests)
+    ]
+
+
+def double_sold_seats(performance_id):
+    return list(
+        Ticket.objects.filter(performance_id=performance_id)
+        .values("row", "seat")
+        .annotate(sold=Count("id"))
+        .filter(sold__gt=1)
+        .values_list("row", "seat", "sold")
+    )
+
+
+def run_reservation_load(
+    make_transport,
+    performance,
+    workers,
+    requests_per_worker,
+    seats_per_request=2,
+    hot_seats=20,
+    seed=42,
+):
+    """
+    POST overlapping reservations for one performance from workers threads
+    at once, each with its own transport, user and database connection.
+
+    Every request either reserves all its seats (201) or is rejected as a
+    conflict (400); any other status is reported as an error. The result
+    also lists seats sold twice, which must stay empty, and the
+    tickets_sold counter next to the real ticket count.
+    """
+    rng = random.Random(seed)
+    url = reverse("service:reservation-list")
+    plans = [
+        overlapping_seat_sets(
+            performance.theatre_hall, requests_per_worker, seats_per_request, hot_seats, rng
+        )
+        for _ in range(workers)
+    ]
+    start = threading.Barrier(workers)
+
+    def worker(index):
+        timings = []
+        statuses = []
+        try:
+            try:
+                transport = make_transport(index)
+            except Exception:
+                start.abort()
+                raise
+            start.wait()
+            for seats in plans[index]:
+                item = scenario("reserve", url, "POST", {"tickets": [
+                    {"row": row, "seat": seat, "performance": performance.id}
+                    for row, seat in seats
+                ]})
+                transport.prepare()
+                started = time.perf_counter()
+                response = transport.request(item)
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses.append(response.status)
+        finally:
+            connections.close_all()
+
+        return timings, statuses
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(worker, range(workers)))
+    elapsed = time.perf_counter() - started
+
+    timings = [timing for worker_timings, _ in outcomes for timing in worker_timings]
+    statuses = [status for _, worker_statuses in outcomes for status in worker_statuses]
+    reserved = statuses.count(201)
+    conflicts = statuses.count(400)
+    performance.refresh_from_db(fields=["tickets_sold"])
+
+    return {
+        "performance": performance.id,
+        "workers": workers,
+        "requests": len(statuses),
+        "reserved": reserved,
+        "conflicts": conflicts,
+        "errors": len(statuses) - reserved - conflicts,
+        "conflict_rate": round(conflicts / len(statuses), 4) if statuses else 0,
+        "throughput_rps": round(len(statuses) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 3) if timings else None,
+        "p95_ms": round(percentile(timings, 95), 3) if timings else None,
+        "p99_ms": round(percentile(timings, 99), 3) if timings else None,
+        "mean_ms": round(statistics.fmean(timings), 3) if timings else None,
+        "tickets_sold": Ticket.objects.filter(performance_id=performance.id).count(),
+        "tickets_sold_counter": performance.tickets_sold,
+        "double_sold": double_sold_seats(performance.id),
+    }
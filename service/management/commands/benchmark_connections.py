@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from service.benchmark import (
+    CONNECTION_PROFILES,
+    ClientTransport,
+    default_scenarios,
+    run_connection_benchmark,
+)
+from service.management.commands.seed_benchmark import (
+    BENCHMARK_USER_EMAIL,
+    BENCHMARK_USER_PASSWORD,
+)
+
+DEFAULT_SCENARIOS = ("genres", "play detail", "performance detail", "seat map")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request latency with a new database connection per "
+        "request and with persistent connections"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--only",
+            nargs="*",
+            default=DEFAULT_SCENARIOS,
+            help="Scenarios of run_benchmark to use, small reads by default",
+        )
+        parser.add_argument("--email", default=BENCHMARK_USER_EMAIL)
+        parser.add_argument("--output", help="JSON file for the results")
+
+    def handle(self, *args, **options):
+        scenarios = [
+            item for item in default_scenarios(options["email"], BENCHMARK_USER_PASSWORD)
+            if item.name in options["only"]
+        ]
+        results = run_connection_benchmark(
+            ClientTransport(options["email"]), scenarios, options["iterations"]
+        )
+
+        self.stdout.write(f"Opening a connection takes {results['connect_ms']:.2f}ms")
+        baseline_name = next(iter(CONNECTION_PROFILES))
+        baseline = results["profiles"][baseline_name]["scenarios"]
+
+        for name, profile in results["profiles"].items():
+            self.stdout.write(f"\n{name}: {profile['connections']} connections opened")
+            for scenario_name, stats in profile["scenarios"].items():
+                saved = baseline[scenario_name]["mean_ms"] - stats["mean_ms"]
+                self.stdout.write(
+                    f"  {scenario_name:<20} p50 {stats['p50_ms']:>8.2f}ms  "
+                    f"mean {stats['mean_ms']:>8.2f}ms  saved {saved:>6.2f}ms/request"
+                )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
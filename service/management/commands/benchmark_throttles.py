@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from service.benchmark import run_throttle_benchmark
+
+DEFAULT_THROTTLES = (
+    "rest_framework.throttling.UserRateThrottle",
+    "service.throttling.SlidingWindowUserThrottle",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time allow_request() of throttle classes for a client with a "
+        "growing number of earlier requests in the window"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=500)
+        parser.add_argument(
+            "--history",
+            default="0,100,1000,3000",
+            help="Comma separated numbers of earlier requests, 3000 is the daily user rate",
+        )
+        parser.add_argument("--throttles", nargs="*", default=DEFAULT_THROTTLES)
+        parser.add_argument("--output", help="JSON file for the results")
+
+    def handle(self, *args, **options):
+        try:
+            histories = [int(history) for history in options["history"].split(",")]
+        except ValueError:
+            raise CommandError("--history expects comma separated integers")
+
+        results = run_throttle_benchmark(
+            [import_string(path) for path in options["throttles"]],
+            options["calls"],
+            histories,
+        )
+
+        for name, runs in results.items():
+            self.stdout.write(name)
+            for history, stats in runs.items():
+                self.stdout.write(
+                    f"  {history:>6} earlier requests  mean {stats['mean_us']:>9.2f}us  "
+                    f"p95 {stats['p95_us']:>9.2f}us  cached {stats['cache_bytes']:>7} bytes"
+                )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
@@ -0,0 +1,72 @@
+import json
+from itertools import cycle
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from service.benchmark import HttpTransport, git_revision, run_concurrent, server_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent throughput of the DRF endpoints on the WSGI server "
+        "with the async endpoints on the ASGI server"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", default="http://127.0.0.1:8001")
+        parser.add_argument("--asgi-url", default="http://127.0.0.1:8002")
+        parser.add_argument(
+            "--concurrency",
+            default="1,16,64",
+            help="Comma separated numbers of connections in flight at once",
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+        parser.add_argument("--users", type=int, default=100, help="Users to spread requests over")
+        parser.add_argument("--output", help="JSON file for the results")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency expects comma separated integers")
+
+        users = list(
+            get_user_model().objects.filter(is_active=True).order_by("id")[:options["users"]]
+        )
+        if not users:
+            raise CommandError("No users to request as, e.g. run seed_benchmark first")
+        # Tokens are minted here, the servers must share SECRET_KEY. Spreading
+        # requests over many users keeps them under the per-user throttle.
+        tokens = cycle([str(RefreshToken.for_user(user).access_token) for user in users])
+
+        results = {"revision": git_revision(), "runs": []}
+        for name, sync, async_ in server_scenarios():
+            # The sync views under ASGI show what the thread hand-off costs
+            targets = (
+                ("wsgi", options["wsgi_url"], sync, "sync"),
+                ("asgi", options["asgi_url"], sync, "sync"),
+                ("asgi", options["asgi_url"], async_, "async"),
+            )
+            for server, base_url, item, view in targets:
+                for level in levels:
+                    transports = [
+                        HttpTransport(base_url, token=next(tokens)) for _ in range(level)
+                    ]
+                    run = dict(
+                        run_concurrent(transports, item, options["requests"]),
+                        scenario=name,
+                        server=server,
+                        view=view,
+                    )
+                    results["runs"].append(run)
+                    self.stdout.write(
+                        f"{name:<16} {server} {view:<5} c={level:<4} "
+                        f"{run['throughput_rps']:>8.1f} req/s  p50 {run['p50_ms']:>8.2f}ms  "
+                        f"p95 {run['p95_ms']:>8.2f}ms  statuses {run['statuses']}"
+                    )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from service.images import orphaned_media
+
+
+class Command(BaseCommand):
+    help = "Delete uploaded files under MEDIA_ROOT that no play refers to any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--directory", default="uploads", help="Directory of MEDIA_ROOT to clean")
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=60,
+            help="Minutes a file must exist before it is deleted, for uploads still in progress",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only list what would be deleted")
+
+    def handle(self, *args, **options):
+        if not default_storage.exists(options["directory"]):
+            self.stdout.write(f"Nothing to clean, {options['directory']} does not exist")
+            return
+
+        count = size = 0
+        for name in orphaned_media(options["directory"], timedelta(minutes=options["min_age"])):
+            count += 1
+            size += default_storage.size(name)
+            if options["dry_run"]:
+                self.stdout.write(name)
+            else:
+                default_storage.delete(name)
+
+        action = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{action} {count} files, {size / 1024:.1f} KiB"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from service.images import process_play_image
+from service.models import Play
+
+
+class Command(BaseCommand):
+    help = "Generate resized copies of play images uploaded before they existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also regenerate plays that have them, e.g. after IMAGE_VARIANT_WIDTHS changed",
+        )
+
+    def handle(self, *args, **options):
+        plays = Play.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            plays = plays.filter(image_variants={})
+
+        count = 0
+        for play_id, name in plays.values_list("id", "image").iterator():
+            process_play_image(play_id, name)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated image variants of {count} plays"))
@@ -0,0 +1,70 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service.importer import IMPORTERS, batched, import_batch, read_rows
+
+KIND_ALIASES = {"halls": "theatre_halls", "theatre-halls": "theatre_halls"}
+
+
+def file_kind(path, kind=None):
+    kind = kind or Path(path).stem
+    kind = KIND_ALIASES.get(kind, kind)
+
+    if kind not in IMPORTERS:
+        raise CommandError(
+            f"Cannot tell what {path} contains, name it after one of "
+            f"{', '.join(IMPORTERS)} or pass --kind"
+        )
+
+    return kind
+
+
+class Command(BaseCommand):
+    help = (
+        "Import genres, actors, theatre halls, plays and performances from "
+        "CSV or JSON-lines files with batched upserts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="+",
+            help="Files named after what they contain, e.g. plays.csv or performances.jsonl",
+        )
+        parser.add_argument("--kind", choices=list(IMPORTERS), help="Kind of every given file")
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        files = sorted(
+            ((file_kind(path, options["kind"]), path) for path in options["paths"]),
+            # Dependencies first: plays refer to actors and genres, performances to plays and halls
+            key=lambda item: list(IMPORTERS).index(item[0]),
+        )
+
+        for kind, path in files:
+            self.import_file(kind, path, options["batch_size"])
+
+    def import_file(self, kind, path, batch_size):
+        started = time.perf_counter()
+        imported = 0
+
+        try:
+            for batch in batched(read_rows(path), batch_size):
+                try:
+                    imported += import_batch(kind, batch)
+                except ValueError as error:
+                    raise CommandError(
+                        f"{path}: batch starting at row {imported + 1}: {error}"
+                    )
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{kind}: {imported} rows in {elapsed:.1f}s "
+                    f"({imported / max(elapsed, 1e-9):.0f} rows/s)"
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} {kind} from {path}"))
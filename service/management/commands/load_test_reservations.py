@@ -0,0 +1,109 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from service.benchmark import ClientTransport, HttpTransport
+from service.loadtest import run_reservation_load
+from service.management.commands.seed_benchmark import BENCHMARK_USER_PASSWORD
+from service.models import Performance, Play, TheatreHall
+from service.scheduling import MAX_FREE_SLOTS_WINDOW, free_slots
+
+
+class Command(BaseCommand):
+    help = "Reserve overlapping seats from concurrent workers and check nothing is sold twice"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=("client", "http"), default="client")
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=25, help="Requests per worker")
+        parser.add_argument("--seats", type=int, default=2, help="Seats per reservation")
+        parser.add_argument(
+            "--hot-seats",
+            type=int,
+            default=20,
+            help="Size of the seat pool all workers compete for",
+        )
+        parser.add_argument(
+            "--performance",
+            type=int,
+            help="Performance to sell, by default a new one is created for each run",
+        )
+        parser.add_argument(
+            "--password",
+            default=BENCHMARK_USER_PASSWORD,
+            help="Password of the worker users in http mode",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="JSON file for the results")
+
+    def get_performance(self, performance_id):
+        if performance_id:
+            try:
+                return Performance.objects.select_related("theatre_hall").get(id=performance_id)
+            except Performance.DoesNotExist:
+                raise CommandError(f"Performance {performance_id} does not exist")
+
+        play = Play.objects.order_by("id").first()
+        theatre_hall = TheatreHall.objects.order_by("id").first()
+        if play is None or theatre_hall is None:
+            raise CommandError("Create a play and a theatre hall first, e.g. with seed_benchmark")
+
+        start = timezone.now() + timedelta(days=30)
+        slots = free_slots(theatre_hall.id, start, start + MAX_FREE_SLOTS_WINDOW, play.duration)
+        if not slots:
+            raise CommandError(f"{theatre_hall.name} has no free slot, pass --performance")
+
+        return Performance.objects.create(
+            play=play,
+            theatre_hall=theatre_hall,
+            show_time=slots[0][0],
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        emails = list(
+            get_user_model().objects.filter(is_active=True)
+            .order_by("id")
+            .values_list("email", flat=True)[:workers]
+        )
+        if not emails:
+            raise CommandError("No users to reserve as, e.g. run seed_benchmark first")
+
+        performance = self.get_performance(options["performance"])
+
+        def make_transport(index):
+            email = emails[index % len(emails)]
+            if options["mode"] == "http":
+                return HttpTransport(options["base_url"], email, options["password"])
+            return ClientTransport(email)
+
+        results = run_reservation_load(
+            make_transport,
+            performance,
+            workers,
+            options["requests"],
+            seats_per_request=options["seats"],
+            hot_seats=options["hot_seats"],
+            seed=options["seed"],
+        )
+
+        for name, value in results.items():
+            self.stdout.write(f"{name:<22} {value}")
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+
+        if results["double_sold"]:
+            raise CommandError(f"Seats sold more than once: {results['double_sold']}")
+        if results["tickets_sold"] != results["tickets_sold_counter"]:
+            raise CommandError(
+                f"tickets_sold counter is {results['tickets_sold_counter']}, "
+                f"but {results['tickets_sold']} tickets exist"
+            )
+        if results["errors"]:
+            raise CommandError(f"{results['errors']} requests failed unexpectedly")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from service.holds import get_hold_backend
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds"
+
+    def handle(self, *args, **options):
+        purged = get_hold_backend().purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired seat holds"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from service.listings import rebuild_listings, stale_listings
+
+
+class Command(BaseCommand):
+    help = "Recompute the performance listing read model where it drifted from its sources"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report stale listings and exit with an error if any are found",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            stale, orphans = stale_listings()
+        else:
+            with transaction.atomic():
+                stale, orphans = rebuild_listings()
+
+        for performance_id in stale:
+            self.stdout.write(f"Performance {performance_id}: listing missing or stale")
+        for performance_id in orphans:
+            self.stdout.write(f"Performance {performance_id}: listing of a deleted performance")
+
+        count = len(stale) + len(orphans)
+        if options["check"] and count:
+            raise CommandError(f"{count} performance listings are out of sync")
+
+        if options["check"]:
+            self.stdout.write(self.style.SUCCESS("All performance listings are in sync"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} performance listings"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from service.counters import rebuild_tickets_sold, stale_tickets_sold
+
+
+class Command(BaseCommand):
+    help = "Recount sold tickets for every performance and fix stale counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report stale counters and exit with an error if any are found",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            stale = stale_tickets_sold()
+        else:
+            with transaction.atomic():
+                stale = rebuild_tickets_sold()
+
+        for performance_id, stored, actual in stale:
+            self.stdout.write(
+                f"Performance {performance_id}: stored {stored}, actual {actual}"
+            )
+
+        if options["check"] and stale:
+            raise CommandError(f"{len(stale)} ticket counters are out of sync")
+
+        if options["check"]:
+            self.stdout.write(self.style.SUCCESS("All ticket counters are in sync"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(stale)} ticket counters"))
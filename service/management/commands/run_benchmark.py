@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service.benchmark import (
+    ClientTransport,
+    HttpTransport,
+    compare,
+    default_scenarios,
+    run_benchmark,
+)
+from service.management.commands.seed_benchmark import (
+    BENCHMARK_USER_EMAIL,
+    BENCHMARK_USER_PASSWORD,
+)
+
+
+class Command(BaseCommand):
+    help = "Measure API latency, query counts and memory against the seeded dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=("client", "http"), default="client")
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Server to call in http mode",
+        )
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", nargs="*", help="Run only scenarios with these names")
+        parser.add_argument("--email", default=BENCHMARK_USER_EMAIL)
+        parser.add_argument("--password", default=BENCHMARK_USER_PASSWORD)
+        parser.add_argument(
+            "--output",
+            help="JSON file for the results, defaults to benchmarks/<revision>-<mode>.json",
+        )
+        parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed p95 growth against the baseline, as a fraction",
+        )
+
+    def handle(self, *args, **options):
+        scenarios = default_scenarios(options["email"], options["password"])
+        if options["only"]:
+            scenarios = [item for item in scenarios if item.name in options["only"]]
+
+        if options["mode"] == "http":
+            transport = HttpTransport(options["base_url"], options["email"], options["password"])
+        else:
+            transport = ClientTransport(options["email"])
+
+        results = run_benchmark(
+            transport,
+            scenarios,
+            options["iterations"],
+            warmup=options["warmup"],
+            mode=options["mode"],
+        )
+
+        for name, stats in results["scenarios"].items():
+            self.stdout.write(
+                f"{name:<20} p50 {stats['p50_ms']:>9.2f}ms  p95 {stats['p95_ms']:>9.2f}ms  "
+                f"p99 {stats['p99_ms']:>9.2f}ms  queries {stats['queries']}  statuses {stats['statuses']}"
+            )
+
+        output = Path(
+            options["output"]
+            or f"benchmarks/{results['revision'] or 'worktree'}-{options['mode']}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Results written to {output}")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = compare(results, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions found:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,234 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from service.importer import batched
+from service.listings import rebuild_listings
+from service.models import Actor, Genre, Play, TheatreHall, Performance, Reservation, Ticket
+from service.search import play_search_vector, actor_search_vector
+
+BENCHMARK_USER_EMAIL = "benchmark@example.com"
+BENCHMARK_USER_PASSWORD = "benchmark12345"
+
+DEFAULT_VOLUMES = {
+    "genres": 60,
+    "actors": 50_000,
+    "plays": 100_000,
+    "halls": 1_000,
+    "performances": 1_000_000,
+    "tickets": 20_000_000,
+    "users": 10_000,
+}
+
+WORDS = (
+    "night", "king", "garden", "storm", "winter", "letter", "mirror", "house", "river",
+    "dream", "city", "summer", "song", "shadow", "bridge", "widow", "island", "crown",
+)
+FIRST_NAMES = ("Oleg", "Anna", "Ivan", "Maria", "John", "Olena", "Petro", "Sofia", "Taras", "Iryna")
+LAST_NAMES = ("Gordienko", "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Melnyk", "Boyko")
+RUNTIMES = (90, 120, 150, 180)
+
+
+class Command(BaseCommand):
+    help = "Fill the database with a synthetic large-theatre dataset for benchmarks"
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiply every volume, e.g. 0.01 for a quick local dataset",
+        )
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Seed even if the database already contains plays",
+        )
+
+    def log_progress(self, name, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{name}: {count} rows in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} rows/s)")
+
+    def bulk(self, name, model, objects, batch_size, keep=None):
+        """
+        Insert objects in batches, returning what keep() extracts from each
+        created row so large tables never sit in memory as model instances.
+        """
+        started = time.perf_counter()
+        created = []
+        count = 0
+        for batch in batched(objects, batch_size):
+            rows = model.objects.bulk_create(batch, batch_size=batch_size)
+            count += len(rows)
+            if keep:
+                created.extend(map(keep, rows))
+        self.log_progress(name, count, started)
+        return created
+
+    def handle(self, *args, **options):
+        if Play.objects.exists() and not options["force"]:
+            raise CommandError("Database is not empty, pass --force to seed anyway")
+
+        rng = random.Random(options["seed"])
+        volumes = {name: max(1, int(options[name] * options["scale"])) for name in DEFAULT_VOLUMES}
+        batch_size = options["batch_size"]
+
+        users = self.seed_users(volumes["users"], batch_size)
+        genres = self.bulk("genres", Genre, (
+            Genre(name=f"{WORDS[i % len(WORDS)].title()} {i}") for i in range(volumes["genres"])
+        ), batch_size, keep=lambda genre: genre.id)
+        actors = self.bulk("actors", Actor, (
+            Actor(first_name=rng.choice(FIRST_NAMES), last_name=f"{rng.choice(LAST_NAMES)}{i}")
+            for i in range(volumes["actors"])
+        ), batch_size, keep=lambda actor: actor.id)
+        plays = self.bulk("plays", Play, (
+            Play(
+                title=f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}",
+                description=" ".join(rng.choices(WORDS, k=30)),
+                runtime=rng.choice(RUNTIMES),
+            )
+            for i in range(volumes["plays"])
+        ), batch_size, keep=lambda play: (play.id, play.duration))
+        self.seed_play_relations(rng, [play_id for play_id, _ in plays], actors, genres, batch_size)
+
+        halls = self.bulk("halls", TheatreHall, (
+            TheatreHall(name=f"Hall {i}", rows=rng.randint(10, 30), seats_in_row=rng.randint(15, 40))
+            for i in range(volumes["halls"])
+        ), batch_size, keep=lambda hall: hall)
+        performances = self.seed_performances(rng, plays, halls, volumes, batch_size)
+        self.seed_tickets(rng, users, performances, batch_size)
+
+        started = time.perf_counter()
+        Play.objects.update(search_vector=play_search_vector())
+        Actor.objects.update(search_vector=actor_search_vector())
+        self.log_progress("search vectors", len(plays) + len(actors), started)
+
+        started = time.perf_counter()
+        stale, _ = rebuild_listings(batch_size)
+        self.log_progress("performance listings", len(stale), started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded benchmark dataset, log in as {BENCHMARK_USER_EMAIL} / {BENCHMARK_USER_PASSWORD}"
+        ))
+
+    def seed_users(self, count, batch_size):
+        user_model = get_user_model()
+        existing = list(
+            user_model.objects
+            .filter(Q(email=BENCHMARK_USER_EMAIL) | Q(email__endswith="@benchmark.example.com"))
+            .values_list("id", flat=True)
+        )
+        if existing:
+            self.stdout.write(f"users: reusing {len(existing)} existing benchmark users")
+            return existing
+
+        # Hash once; every synthetic user shares the same password
+        password = make_password(BENCHMARK_USER_PASSWORD)
+        return self.bulk("users", user_model, (
+            user_model(
+                email=BENCHMARK_USER_EMAIL if i == 0 else f"user{i}@benchmark.example.com",
+                password=password,
+                is_staff=i == 0,
+            )
+            for i in range(count)
+        ), batch_size, keep=lambda user: user.id)
+
+    def seed_play_relations(self, rng, plays, actors, genres, batch_size):
+        play_actors = Play.actors.through
+        play_genres = Play.genres.through
+
+        self.bulk("play actors", play_actors, (
+            play_actors(play_id=play_id, actor_id=actor_id)
+            for play_id in plays
+            for actor_id in rng.sample(actors, min(len(actors), rng.randint(2, 8)))
+        ), batch_size)
+        self.bulk("play genres", play_genres, (
+            play_genres(play_id=play_id, genre_id=genre_id)
+            for play_id in plays
+            for genre_id in rng.sample(genres, min(len(genres), rng.randint(1, 3)))
+        ), batch_size)
+
+    def seed_performances(self, rng, plays, halls, volumes, batch_size):
+        """
+        Create performances with their final tickets_sold already set, so the
+        counters match the tickets inserted afterwards.
+
+        Each hall's performances follow one another with random gaps, as
+        the exclusion constraint forbids overlaps.
+        """
+        tickets_per_performance = volumes["tickets"] / volumes["performances"]
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=365)
+        next_free = {hall.id: start for hall in halls}
+
+        def performances():
+            for _ in range(volumes["performances"]):
+                hall = rng.choice(halls)
+                play_id, duration = rng.choice(plays)
+                show_time = next_free[hall.id] + timedelta(hours=rng.randrange(24))
+                next_free[hall.id] = show_time + duration
+                sold = min(
+                    hall.rows * hall.seats_in_row,
+                    int(rng.expovariate(1 / tickets_per_performance)) if tickets_per_performance else 0
+                )
+                yield Performance(
+                    play_id=play_id,
+                    theatre_hall_id=hall.id,
+                    show_time=show_time,
+                    ends_at=show_time + duration,
+                    tickets_sold=sold,
+                )
+
+        seats_in_row = {hall.id: hall.seats_in_row for hall in halls}
+
+        return self.bulk(
+            "performances",
+            Performance,
+            performances(),
+            batch_size,
+            keep=lambda performance: (
+                performance.id,
+                seats_in_row[performance.theatre_hall_id],
+                performance.tickets_sold,
+            ),
+        )
+
+    def seed_tickets(self, rng, users, performances, batch_size):
+        started = time.perf_counter()
+        total = 0
+
+        def reservations_with_tickets():
+            for performance_id, seats_in_row, sold in performances:
+                seat_index = 0
+                while seat_index < sold:
+                    size = min(rng.randint(1, 6), sold - seat_index)
+                    yield performance_id, seats_in_row, seat_index, size
+                    seat_index += size
+
+        for batch in batched(reservations_with_tickets(), batch_size):
+            reservations = Reservation.objects.bulk_create([
+                Reservation(user_id=rng.choice(users)) for _ in batch
+            ])
+            tickets = [
+                Ticket(
+                    row=index // seats_in_row + 1,
+                    seat=index % seats_in_row + 1,
+                    performance_id=performance_id,
+                    reservation_id=reservation.id,
+                )
+                for reservation, (performance_id, seats_in_row, first, size) in zip(reservations, batch)
+                for index in range(first, first + size)
+            ]
+            Ticket.objects.bulk_create(tickets, batch_size=batch_size)
+            total += len(tickets)
+
+        self.log_progress("tickets", total, started)
@@ -0,0 +1,262 @@
+import functools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.serializers import ListSerializer, Serializer
+
+logger = logging.getLogger(__name__)
+
+# Collector of the request being handled. A context variable, so queries
+# that async views run through sync_to_async, on the connections of an
+# executor thread, are counted for their request too.
+current_collector = ContextVar("current_collector", default=None)
+# SerializationTimer of the request being handled
+current_serialization = ContextVar("current_serialization", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCollector:
+    """execute_wrapper hook counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class SerializationTimer:
+    """
+    Time spent in serializer.data, including queries it triggers. Nested
+    accesses, such as a method field serializing related objects, are
+    counted once as part of the outermost one.
+    """
+
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+
+    def measure(self, get_data, serializer):
+        if self.depth:
+            return get_data(serializer)
+
+        self.depth += 1
+        started = time.perf_counter()
+        try:
+            return get_data(serializer)
+        finally:
+            self.depth -= 1
+            self.duration += time.perf_counter() - started
+
+
+def timed_data(get_data):
+    @functools.wraps(get_data)
+    def data(serializer):
+        timer = current_serialization.get()
+        if timer is None:
+            return get_data(serializer)
+
+        return timer.measure(get_data, serializer)
+
+    data.timed = True
+    return property(data)
+
+
+def install_serializer_timing():
+    """
+    Time serializer.data, which DRF evaluates inside the view, so it
+    cannot be measured around the view like rendering is.
+    """
+    for serializer_class in (Serializer, ListSerializer):
+        if not getattr(serializer_class.data.fget, "timed", False):
+            serializer_class.data = timed_data(serializer_class.data.fget)
+
+
+class RequestMetrics:
+    """In-process per-view aggregates, exposed by the metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, queries, db_time, serialize_time, render_time, total_time):
+        with self._lock:
+            stats = self._views.setdefault(view_name, {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_ms": 0.0,
+                "serialize_ms": 0.0,
+                "render_ms": 0.0,
+                "total_ms": 0.0,
+                "max_total_ms": 0.0,
+            })
+            stats["requests"] += 1
+            stats["queries"] += queries
+            stats["max_queries"] = max(stats["max_queries"], queries)
+            stats["db_ms"] += db_time * 1000
+            stats["serialize_ms"] += serialize_time * 1000
+            stats["render_ms"] += render_time * 1000
+            stats["total_ms"] += total_time * 1000
+            stats["max_total_ms"] = max(stats["max_total_ms"], total_time * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view_name: dict(
+                    stats,
+                    avg_queries=stats["queries"] / stats["requests"],
+                    avg_total_ms=stats["total_ms"] / stats["requests"],
+                )
+                for view_name, stats in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+def collect_queries(execute, sql, params, many, context):
+    collector = current_collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+
+    return collector(execute, sql, params, many, context)
+
+
+def install_query_hook(connection):
+    if collect_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(collect_queries)
+
+
+@receiver(connection_created)
+def install_query_hook_on_connect(sender, connection, **kwargs):
+    # Connections are per thread; this reaches those of every thread
+    install_query_hook(connection)
+
+
+def query_budget(request):
+    """
+    Look up the budget by "ViewSet.action", then URL name, then viewset name.
+    """
+    budgets = settings.QUERY_BUDGETS
+    match = request.resolver_match
+    if match is None:
+        return None
+
+    view_class = getattr(match.func, "cls", None)
+    keys = [match.view_name]
+    if view_class is not None:
+        action = getattr(match.func, "actions", {}).get(request.method.lower())
+        keys = [f"{view_class.__name__}.{action}", match.view_name, view_class.__name__]
+
+    for key in keys:
+        if key in budgets:
+            return budgets[key]
+
+    return None
+
+
+class RequestMetricsMiddleware:
+    """
+    Record SQL query count, DB time, serialization time, render time and
+    total time per request.
+
+    The numbers are sent back in a Server-Timing header, aggregated per view
+    in request_metrics and checked against QUERY_BUDGETS.
+    """
+
+    sync_capable = True
+    # Async views stay on the event loop under ASGI instead of being
+    # pushed to a thread because of this middleware
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Also covers connections opened before this module was imported
+        for connection in connections.all():
+            install_query_hook(connection)
+
+        collector, timer = QueryCollector(), SerializationTimer()
+        started = time.perf_counter()
+        tokens = current_collector.set(collector), current_serialization.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_collector.reset(tokens[0])
+            current_serialization.reset(tokens[1])
+
+        return self.finish(request, response, collector, timer, started)
+
+    async def __acall__(self, request):
+        collector, timer = QueryCollector(), SerializationTimer()
+        started = time.perf_counter()
+        tokens = current_collector.set(collector), current_serialization.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_collector.reset(tokens[0])
+            current_serialization.reset(tokens[1])
+
+        return self.finish(request, response, collector, timer, started)
+
+    def finish(self, request, response, collector, timer, started):
+        total_time = time.perf_counter() - started
+        render_time = getattr(request, "_render_time", 0.0)
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+
+        response["Server-Timing"] = ", ".join((
+            f'db;dur={collector.duration * 1000:.2f};desc="{collector.count} queries"',
+            f"serialize;dur={timer.duration * 1000:.2f}",
+            f"render;dur={render_time * 1000:.2f}",
+            f"total;dur={total_time * 1000:.2f}",
+        ))
+        request_metrics.record(
+            view_name, collector.count, collector.duration, timer.duration, render_time, total_time
+        )
+
+        budget = query_budget(request)
+        if budget is not None and collector.count > budget:
+            message = f"{view_name} ran {collector.count} queries, budget is {budget}"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are encoded to JSON after the view returns; time that step
+        started = time.perf_counter()
+
+        def record_render_time(rendered_response):
+            request._render_time = time.perf_counter() - started
+
+        response.add_post_render_callback(record_render_time)
+        return response
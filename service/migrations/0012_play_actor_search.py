@@ -0,0 +1,71 @@
+# Generated by Django 4.2 on 2026-10-16 23:06
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def fill_search_vectors(apps, schema_editor):
+    Play = apps.get_model("service", "Play")
+    Actor = apps.get_model("service", "Actor")
+
+    Play.objects.update(
+        search_vector=SearchVector("title", weight="A", config="english")
+        + SearchVector("description", weight="B", config="english")
+    )
+    Actor.objects.update(
+        search_vector=SearchVector("first_name", "last_name", config="simple")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("service", "0011_updated_at_version_stamps"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="actor",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="play",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="actor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="actor_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="actor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["first_name", "last_name"],
+                name="actor_name_trgm_idx",
+                opclasses=["gin_trgm_ops", "gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="play_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"], name="play_title_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("service", "0012_play_actor_search"),
+    ]
+
+    # The auto-created through tables already have a unique (play_id, x_id)
+    # index for EXISTS lookups; these serve the grouped "all" match, which
+    # starts from the filtered actor or genre ids.
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX play_actors_actor_play_idx ON service_play_actors (actor_id, play_id);",
+            "DROP INDEX play_actors_actor_play_idx;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX play_genres_genre_play_idx ON service_play_genres (genre_id, play_id);",
+            "DROP INDEX play_genres_genre_play_idx;",
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2 on 2026-10-16 23:40
+
+from datetime import timedelta
+
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+import service.models
+
+
+def fill_ends_at(apps, schema_editor):
+    # Every existing play gets the default runtime, cut short where the next
+    # performance in the hall starts earlier, so schedules made before
+    # runtimes existed do not violate the constraint added below. A second
+    # performance starting at the same time ends at once, an empty range
+    # that overlaps nothing.
+    Performance = apps.get_model("service", "Performance")
+    table = schema_editor.quote_name(Performance._meta.db_table)
+
+    schema_editor.execute(
+        f"""
+        UPDATE {table} AS performance
+        SET ends_at = LEAST(performance.show_time + %s, following.next_show_time)
+        FROM (
+            SELECT id, LEAD(show_time) OVER (
+                PARTITION BY theatre_hall_id ORDER BY show_time, id
+            ) AS next_show_time
+            FROM {table}
+        ) AS following
+        WHERE following.id = performance.id
+        """,
+        [timedelta(minutes=180)],
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("service", "0013_play_relation_filter_indexes"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name="play",
+            name="runtime",
+            field=models.PositiveIntegerField(default=180, help_text="Runtime in minutes"),
+        ),
+        migrations.AddField(
+            model_name="performance",
+            name="ends_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_ends_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="performance",
+            name="ends_at",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name="performance",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ("theatre_hall", "="),
+                    (service.models.TsTzRange("show_time", "ends_at"), "&&"),
+                ],
+                name="exclude_overlapping_performances",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-16 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("service", "0014_play_runtime_performance_exclusion"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["play", "show_time", "id"],
+                name="performance_play_show_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["theatre_hall", "show_time", "id"],
+                name="performance_hall_show_time_idx",
+            ),
+        ),
+    ]
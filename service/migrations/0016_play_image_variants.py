@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("service", "0015_performance_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="play",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 4.2 on 2026-10-17 00:03
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def fill_listings(apps, schema_editor):
+    Performance = apps.get_model("service", "Performance")
+    PerformanceListing = apps.get_model("service", "PerformanceListing")
+
+    now = timezone.now()
+    rows = Performance.objects.annotate(
+        num_of_seats=F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+    ).values_list(
+        "id",
+        "show_time",
+        "ends_at",
+        "play_id",
+        "play__title",
+        "theatre_hall_id",
+        "theatre_hall__name",
+        "num_of_seats",
+        "tickets_sold",
+        "updated_at",
+    )
+    PerformanceListing.objects.bulk_create(
+        (
+            PerformanceListing(
+                id=id,
+                show_time=show_time,
+                ends_at=ends_at,
+                play_id=play_id,
+                play_title=play_title,
+                theatre_hall_id=theatre_hall_id,
+                theatre_hall_name=theatre_hall_name,
+                num_of_seats=num_of_seats,
+                tickets_sold=tickets_sold,
+                tickets_available=num_of_seats - tickets_sold,
+                updated_at=updated_at,
+                refreshed_at=now,
+            )
+            for (
+                id, show_time, ends_at, play_id, play_title, theatre_hall_id,
+                theatre_hall_name, num_of_seats, tickets_sold, updated_at,
+            ) in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("service", "0016_play_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PerformanceListing",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("show_time", models.DateTimeField()),
+                ("ends_at", models.DateTimeField()),
+                ("play_id", models.BigIntegerField()),
+                ("play_title", models.CharField(max_length=63)),
+                ("theatre_hall_id", models.BigIntegerField()),
+                ("theatre_hall_name", models.CharField(max_length=63)),
+                ("num_of_seats", models.IntegerField()),
+                ("tickets_sold", models.PositiveIntegerField()),
+                ("tickets_available", models.IntegerField()),
+                ("updated_at", models.DateTimeField()),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="performancelisting",
+            index=models.Index(
+                fields=["show_time", "id"], name="listing_show_time_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performancelisting",
+            index=models.Index(
+                fields=["play_id", "show_time", "id"], name="listing_play_show_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="performancelisting",
+            index=models.Index(
+                fields=["theatre_hall_id", "show_time", "id"],
+                name="listing_hall_show_time_idx",
+            ),
+        ),
+        migrations.RunPython(fill_listings, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,28 @@
 import os
 import uuid
+from datetime import timedelta
 
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import UniqueConstraint
 from django.core.exceptions import ValidationError
-from django.utils.text import slugify
+
+
+DEFAULT_RUNTIME = 180
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
 
 
 class Genre(models.Model):
     name = models.CharField(max_length=63, null=False, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return str(self.name)
@@ -18,6 +31,18 @@ class Genre(models.Model):
 class Actor(models.Model):
     first_name = models.CharField(max_length=255, null=False)
     last_name = models.CharField(max_length=255, null=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="actor_search_vector_idx"),
+            GinIndex(
+                fields=["first_name", "last_name"],
+                name="actor_name_trgm_idx",
+                opclasses=["gin_trgm_ops", "gin_trgm_ops"]
+            ),
+        ]
 
     @property
     def full_name(self):
@@ -28,10 +53,8 @@ class Actor(models.Model):
 
 
 def play_img_file_path(instance, filename):
-    _, extension = os.path.splitext(filename)
-
-    filename = f"{slugify(instance.title)}-{uuid.uuid4()}.{extension}"
-
+    # ContentAddressedStorage names the file after its content, keeping
+    # only the directory and extension
     return os.path.join("uploads/plays/", filename)
 
 
@@ -41,6 +64,21 @@ class Play(models.Model):
     actors = models.ManyToManyField(Actor, related_name="plays", blank=True)
     genres = models.ManyToManyField(Genre, related_name="genres", blank=True)
     image = models.ImageField(null=True, upload_to=play_img_file_path)
+    # {format: {width: name}} of resized copies of image, see service.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    runtime = models.PositiveIntegerField(default=DEFAULT_RUNTIME, help_text="Runtime in minutes")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="play_search_vector_idx"),
+            GinIndex(fields=["title"], name="play_title_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
+
+    @property
+    def duration(self):
+        return timedelta(minutes=self.runtime)
 
     def __str__(self):
         return str(self.title)
@@ -50,6 +88,7 @@ class TheatreHall(models.Model):
     name = models.CharField(max_length=63, null=False, unique=True)
     rows = models.IntegerField()
     seats_in_row = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     @property
     def num_of_seats(self):
@@ -67,12 +106,71 @@ class Performance(models.Model):
         TheatreHall, on_delete=models.CASCADE, related_name="performances"
     )
     show_time = models.DateTimeField()
+    # show_time + play runtime, stored because the exclusion constraint
+    # can only index immutable expressions
+    ends_at = models.DateTimeField(editable=False)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @property
+    def tickets_available(self):
+        return self.theatre_hall.num_of_seats - self.tickets_sold
 
     def __str__(self):
         return f"{self.play.title} - {self.theatre_hall.name} - {self.show_time}"
 
+    def save(self, *args, **kwargs):
+        self.ends_at = self.show_time + self.play.duration
+        return super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["-show_time"]
+        indexes = [
+            models.Index(fields=["show_time", "id"], name="performance_show_time_id_idx"),
+            models.Index(fields=["play", "show_time", "id"], name="performance_play_show_time_idx"),
+            models.Index(
+                fields=["theatre_hall", "show_time", "id"], name="performance_hall_show_time_idx"
+            ),
+        ]
+        constraints = [
+            ExclusionConstraint(
+                name="exclude_overlapping_performances",
+                expressions=[
+                    ("theatre_hall", RangeOperators.EQUAL),
+                    (TsTzRange("show_time", "ends_at"), RangeOperators.OVERLAPS),
+                ],
+            ),
+        ]
+
+
+class PerformanceListing(models.Model):
+    """
+    Everything the performance list returns, one row per performance with
+    the same id, so listings scan a single table. Kept in step with
+    Performance, Play, TheatreHall and Ticket by service.listings.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    show_time = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    play_id = models.BigIntegerField()
+    play_title = models.CharField(max_length=63)
+    theatre_hall_id = models.BigIntegerField()
+    theatre_hall_name = models.CharField(max_length=63)
+    num_of_seats = models.IntegerField()
+    tickets_sold = models.PositiveIntegerField()
+    tickets_available = models.IntegerField()
+    # Of the performance; refreshed_at moves with any change to the row
+    updated_at = models.DateTimeField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["show_time", "id"], name="listing_show_time_id_idx"),
+            models.Index(fields=["play_id", "show_time", "id"], name="listing_play_show_time_idx"),
+            models.Index(
+                fields=["theatre_hall_id", "show_time", "id"], name="listing_hall_show_time_idx"
+            ),
+        ]
 
 
 class Reservation(models.Model):
@@ -83,6 +181,9 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="reservation_created_at_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.created_at}"
@@ -129,3 +230,31 @@ class Ticket(models.Model):
     ):
         self.full_clean()
         return super(Ticket, self).save(force_insert, force_update, using, update_fields)
+
+
+class SeatHold(models.Model):
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="seat_holds", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user} - {self.expires_at}"
+
+
+class HeldSeat(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="held_seats"
+    )
+    hold = models.ForeignKey(
+        SeatHold, on_delete=models.CASCADE, related_name="seats"
+    )
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["row", "seat", "performance"], name="unique_held_seat_performance")
+        ]
@@ -0,0 +1,105 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# Replica the current request reads from, None reads from the primary
+read_alias = ContextVar("read_alias", default=None)
+
+
+def sticky_key(user_id):
+    return f"sticky-primary:{user_id}"
+
+
+def mark_primary_sticky(user):
+    """Send the user's reads to the primary until replicas caught up with their write."""
+    caches[settings.REPLICA_STICKY_CACHE].set(
+        sticky_key(user.pk), True, settings.REPLICA_STICKY_WINDOW.total_seconds()
+    )
+
+
+def reads_from_primary(user):
+    return bool(
+        user is not None
+        and user.is_authenticated
+        and caches[settings.REPLICA_STICKY_CACHE].get(sticky_key(user.pk))
+    )
+
+
+def choose_replica(method, user):
+    """Replica for a request, or None when it must read from the primary."""
+    if not settings.DATABASE_REPLICAS or method not in SAFE_METHODS or reads_from_primary(user):
+        return None
+
+    # One replica per request, so its reads share one snapshot lag
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def reading_from(alias):
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route reads of requests marked by ReplicaReadMixin to their replica.
+
+    Everything else, writes, reads inside a transaction and code outside
+    those requests such as management commands, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests of a DRF view from a replica once the user is
+    authenticated, except during the sticky window after their last write.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with reading_from(None):
+            response = super().dispatch(request, *args, **kwargs)
+
+        user = getattr(self.request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            mark_primary_sticky(user)
+
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Reset when dispatch leaves reading_from()
+        read_alias.set(choose_replica(request.method, request.user))
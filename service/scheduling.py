@@ -0,0 +1,175 @@
+from bisect import bisect_right, insort
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import F
+from django.utils import timezone
+
+from service.models import Performance, Play, TheatreHall, TsTzRange
+
+MAX_BULK_PERFORMANCES = 1000
+MAX_FREE_SLOTS_WINDOW = timedelta(days=92)
+
+DAILY = "daily"
+WEEKLY = "weekly"
+DOUBLE_BOOKING_MESSAGE = "The theatre hall is already booked at this time."
+RUNTIME_OVERLAP_MESSAGE = "Performances of the play would overlap others in their theatre hall."
+OVERLAP_CONSTRAINT = "exclude_overlapping_performances"
+
+
+def is_double_booking(error):
+    """Whether an IntegrityError was raised by the overlap exclusion constraint."""
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == OVERLAP_CONSTRAINT
+
+
+def reschedule_play(play):
+    """
+    Move ends_at of the play's performances to its runtime, returning
+    their ids. Raises IntegrityError when a longer runtime makes them
+    overlap other performances.
+    """
+    performances = Performance.objects.filter(play=play)
+    performance_ids = list(performances.values_list("id", flat=True))
+    performances.update(ends_at=F("show_time") + play.duration, updated_at=timezone.now())
+
+    return performance_ids
+
+
+def expand_recurrence(start, frequency, interval=1, count=None, until=None):
+    """
+    Show times from start, every interval days or weeks, until count
+    occurrences or the until datetime is reached.
+
+    Steps are taken in local time so a daily 19:00 stays at 19:00 across
+    DST changes. At most MAX_BULK_PERFORMANCES + 1 times are produced, so
+    callers can reject oversized rules without expanding them fully.
+    """
+    step = timedelta(days=interval * (7 if frequency == WEEKLY else 1))
+    local_start = timezone.make_naive(start)
+    limit = MAX_BULK_PERFORMANCES + 1 if count is None else min(count, MAX_BULK_PERFORMANCES + 1)
+
+    show_times = []
+    while len(show_times) < limit:
+        show_time = timezone.make_aware(local_start + step * len(show_times))
+        if until is not None and show_time > until:
+            break
+        show_times.append(show_time)
+
+    return show_times
+
+
+def bookings(hall_ids, start, end):
+    """
+    (theatre_hall_id, show_time, ends_at) of performances overlapping
+    [start, end), ordered by show_time.
+
+    The range expression matches the exclusion constraint, so the lookup
+    runs on its GiST index.
+    """
+    return (
+        Performance.objects
+        .annotate(slot=TsTzRange("show_time", "ends_at"))
+        .filter(theatre_hall_id__in=hall_ids, slot__overlap=DateTimeTZRange(start, end))
+        .order_by("show_time")
+        .values_list("theatre_hall_id", "show_time", "ends_at")
+    )
+
+
+class HallSchedule:
+    """Non-overlapping bookings of one hall, kept sorted for bisection."""
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def add(self, start, end):
+        insort(self.starts, start)
+        insort(self.ends, end)
+
+    def overlaps(self, start, end):
+        # Bookings never overlap, so ends are sorted the same way as starts
+        index = bisect_right(self.ends, start)
+        return index < len(self.starts) and self.starts[index] < end
+
+
+def schedule(performances_data):
+    """
+    Validate a batch of performances in memory.
+
+    Returns one error dict per performance (empty when it can be
+    scheduled) and the unsaved performances with ends_at filled in from
+    their play's runtime.
+
+    Halls are locked for the rest of the transaction so concurrent batches
+    cannot book the same slot, then every booking near the requested times
+    is read with a single range query.
+    """
+    hall_ids = {data["theatre_hall"] for data in performances_data}
+    halls = TheatreHall.objects.select_for_update().in_bulk(hall_ids)
+    runtimes = dict(
+        Play.objects.filter(
+            id__in={data["play"] for data in performances_data}
+        ).values_list("id", "runtime")
+    )
+
+    performances = [
+        Performance(
+            play_id=data["play"],
+            theatre_hall_id=data["theatre_hall"],
+            show_time=data["show_time"],
+            ends_at=data["show_time"] + timedelta(minutes=runtimes.get(data["play"], 0)),
+        )
+        for data in performances_data
+    ]
+
+    schedules = defaultdict(HallSchedule)
+    for hall_id, show_time, ends_at in bookings(
+        halls,
+        min(performance.show_time for performance in performances),
+        max(performance.ends_at for performance in performances),
+    ):
+        schedules[hall_id].add(show_time, ends_at)
+
+    errors = []
+    for performance in performances:
+        hall_schedule = schedules[performance.theatre_hall_id]
+
+        if performance.play_id not in runtimes:
+            errors.append({"play": [f'Invalid pk "{performance.play_id}" - object does not exist.']})
+        elif performance.theatre_hall_id not in halls:
+            errors.append({"theatre_hall": [
+                f'Invalid pk "{performance.theatre_hall_id}" - object does not exist.'
+            ]})
+        elif hall_schedule.overlaps(performance.show_time, performance.ends_at):
+            errors.append({"show_time": [DOUBLE_BOOKING_MESSAGE]})
+        else:
+            hall_schedule.add(performance.show_time, performance.ends_at)
+            errors.append({})
+
+    return errors, performances
+
+
+def hall_is_booked(theatre_hall_id, show_time, ends_at, exclude_id=None):
+    overlapping = bookings([theatre_hall_id], show_time, ends_at)
+    if exclude_id is not None:
+        overlapping = overlapping.exclude(id=exclude_id)
+
+    return overlapping.exists()
+
+
+def free_slots(theatre_hall_id, start, end, min_duration=timedelta(0)):
+    """Gaps of at least min_duration between performances in [start, end)."""
+    slots = []
+    cursor = start
+
+    for _, show_time, ends_at in bookings([theatre_hall_id], start, end):
+        if show_time - cursor >= max(min_duration, timedelta.resolution):
+            slots.append((cursor, show_time))
+        cursor = max(cursor, ends_at)
+
+    if end - cursor >= max(min_duration, timedelta.resolution):
+        slots.append((cursor, end))
+
+    return slots
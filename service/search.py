@@ -0,0 +1,63 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from rest_framework.pagination import PageNumberPagination
+
+PLAY_SEARCH_CONFIG = "english"
+ACTOR_SEARCH_CONFIG = "simple"
+
+
+def play_search_vector():
+    return (
+        SearchVector("title", weight="A", config=PLAY_SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=PLAY_SEARCH_CONFIG)
+    )
+
+
+def actor_search_vector():
+    return SearchVector("first_name", "last_name", config=ACTOR_SEARCH_CONFIG)
+
+
+def search(queryset, text, config, trigram_fields):
+    """
+    Full-text match on search_vector, with trigram word similarity on
+    trigram_fields as a typo-tolerant fallback, in a single query that both
+    GIN indexes can serve. Results are ordered by relevance.
+    """
+    query = SearchQuery(text, search_type="websearch", config=config)
+    similarities = [TrigramWordSimilarity(text, field) for field in trigram_fields]
+
+    matches = Q(search_vector=query) | reduce(or_, (
+        Q(**{f"{field}__trigram_word_similar": text}) for field in trigram_fields
+    ))
+
+    return (
+        queryset
+        .filter(matches)
+        .annotate(
+            rank=SearchRank(F("search_vector"), query)
+            + (Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+        )
+        .order_by("-rank", "id")
+    )
+
+
+class SearchPagination(PageNumberPagination):
+    """Paginates only search results; plain listings keep their shape."""
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not request.query_params.get("q"):
+            return None
+
+        return super().paginate_queryset(queryset, request, view)
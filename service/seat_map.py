@@ -0,0 +1,34 @@
+import base64
+
+from service.models import Ticket
+
+
+def build_seat_bitmap(rows, seats_in_row, taken_seats):
+    """
+    Pack occupied seats into a row-major bitmap, one bit per seat.
+
+    Seat (row, seat) maps to bit (row - 1) * seats_in_row + (seat - 1),
+    most significant bit first inside each byte.
+    """
+    bitmap = bytearray((rows * seats_in_row + 7) // 8)
+
+    for row, seat in taken_seats:
+        index = (row - 1) * seats_in_row + (seat - 1)
+        bitmap[index >> 3] |= 0x80 >> (index & 7)
+
+    return bytes(bitmap)
+
+
+def performance_seat_bitmap(performance):
+    theatre_hall = performance.theatre_hall
+    taken_seats = Ticket.objects.filter(
+        performance_id=performance.id
+    ).values_list("row", "seat")
+
+    return build_seat_bitmap(
+        theatre_hall.rows, theatre_hall.seats_in_row, taken_seats.iterator()
+    )
+
+
+def encode_seat_bitmap(bitmap):
+    return base64.b64encode(bitmap).decode("ascii")
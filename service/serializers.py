@@ -1,8 +1,23 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
+from service.booking import UNIQUE_SEAT_MESSAGE, create_tickets, is_seat_taken, ticket_errors
+from service.holds import get_hold_backend
+from service.images import image_srcset
 from service.models import Actor, Genre, Play, Performance, TheatreHall, Ticket, Reservation
+from service.scheduling import (
+    DAILY,
+    WEEKLY,
+    DOUBLE_BOOKING_MESSAGE,
+    MAX_BULK_PERFORMANCES,
+    RUNTIME_OVERLAP_MESSAGE,
+    expand_recurrence,
+    hall_is_booked,
+    is_double_booking,
+)
+from service.seat_map import performance_seat_bitmap, encode_seat_bitmap
 
 
 class ActorSerializer(serializers.ModelSerializer):
@@ -15,13 +30,27 @@ class ActorSerializer(serializers.ModelSerializer):
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
-        fields = "__all__"
+        fields = ("id", "name")
 
 
 class PlaySerializer(serializers.ModelSerializer):
     class Meta:
         model = Play
-        fields = ("id", "title", "description", "actors", "genres", "image")
+        fields = ("id", "title", "description", "runtime", "actors", "genres", "image")
+
+    def save(self, **kwargs):
+        # A longer runtime moves ends_at of the performances, which the
+        # exclusion constraint rejects where they would overlap others
+        if self.instance is None:
+            return super().save(**kwargs)
+
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if not is_double_booking(error):
+                raise
+            raise serializers.ValidationError({"runtime": [RUNTIME_OVERLAP_MESSAGE]})
 
 
 class PlayListSerializer(PlaySerializer):
@@ -35,10 +64,16 @@ class PlayListSerializer(PlaySerializer):
         read_only=True,
         slug_field="name"
     )
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Play
-        fields = ("id", "title", "description", "actors", "genres", "image")
+        fields = ("id", "title", "description", "runtime", "actors", "genres", "image", "image_srcset")
+
+    @extend_schema_field({"type": "object", "additionalProperties": {"type": "string"}})
+    def get_image_srcset(self, play):
+        # Empty until the variants of a new upload are generated
+        return image_srcset(play.image_variants, self.context.get("request"))
 
 
 class PlayDetailSerializer(PlaySerializer):
@@ -63,6 +98,32 @@ class PerformanceSerializer(serializers.ModelSerializer):
         model = Performance
         fields = "__all__"
 
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        play = data.get("play", getattr(self.instance, "play", None))
+        theatre_hall = data.get("theatre_hall", getattr(self.instance, "theatre_hall", None))
+        show_time = data.get("show_time", getattr(self.instance, "show_time", None))
+
+        if hall_is_booked(
+            theatre_hall.id,
+            show_time,
+            show_time + play.duration,
+            exclude_id=getattr(self.instance, "id", None),
+        ):
+            raise serializers.ValidationError({"show_time": [DOUBLE_BOOKING_MESSAGE]})
+
+        return data
+
+    def save(self, **kwargs):
+        # The exclusion constraint still catches a booking made meanwhile
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if not is_double_booking(error):
+                raise
+            raise serializers.ValidationError({"show_time": [DOUBLE_BOOKING_MESSAGE]})
+
 
 class PerformanceListSerializer(PerformanceSerializer):
     play = serializers.SlugRelatedField(
@@ -109,25 +170,167 @@ class PerformanceDetailSerializer(PerformanceSerializer):
     tickets = TicketSerializer(many=True)
 
 
+class PerformanceSeatMapSerializer(serializers.ModelSerializer):
+    rows = serializers.IntegerField(read_only=True, source="theatre_hall.rows")
+    seats_in_row = serializers.IntegerField(read_only=True, source="theatre_hall.seats_in_row")
+    encoding = serializers.SerializerMethodField()
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Performance
+        fields = ("id", "rows", "seats_in_row", "encoding", "seat_map")
+
+    def get_encoding(self, obj):
+        return "base64"
+
+    def get_seat_map(self, obj):
+        return encode_seat_bitmap(performance_seat_bitmap(obj))
+
+
+class PerformanceDetailSeatMapSerializer(PerformanceSerializer):
+    play = PlayDetailSerializer(many=False)
+    theatre_hall = TheatreHallSerializer(many=False)
+    seat_map = serializers.SerializerMethodField()
+
+    def get_seat_map(self, obj):
+        return encode_seat_bitmap(performance_seat_bitmap(obj))
+
+
+class PerformanceBulkListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        if len(attrs) > MAX_BULK_PERFORMANCES:
+            raise serializers.ValidationError(
+                f"At most {MAX_BULK_PERFORMANCES} performances can be created at once."
+            )
+
+        return attrs
+
+
+class PerformanceBulkItemSerializer(serializers.Serializer):
+    """
+    Plain ids instead of related fields: plays and halls of the whole
+    batch are looked up together in service.scheduling.schedule.
+    """
+    play = serializers.IntegerField(min_value=1)
+    theatre_hall = serializers.IntegerField(min_value=1)
+    show_time = serializers.DateTimeField()
+
+    class Meta:
+        list_serializer_class = PerformanceBulkListSerializer
+
+
+class PerformanceRecurrenceSerializer(serializers.Serializer):
+    play = serializers.IntegerField(min_value=1)
+    theatre_hall = serializers.IntegerField(min_value=1)
+    start = serializers.DateTimeField()
+    frequency = serializers.ChoiceField(choices=(DAILY, WEEKLY), default=DAILY)
+    interval = serializers.IntegerField(min_value=1, default=1)
+    count = serializers.IntegerField(min_value=1, required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if ("count" in attrs) == ("until" in attrs):
+            raise serializers.ValidationError("Give either count or until.")
+
+        show_times = expand_recurrence(
+            attrs["start"],
+            attrs["frequency"],
+            attrs["interval"],
+            count=attrs.get("count"),
+            until=attrs.get("until"),
+        )
+        if not show_times:
+            raise serializers.ValidationError("The rule does not produce any performance.")
+        if len(show_times) > MAX_BULK_PERFORMANCES:
+            raise serializers.ValidationError(
+                f"At most {MAX_BULK_PERFORMANCES} performances can be created at once."
+            )
+
+        attrs["show_times"] = show_times
+        return attrs
+
+    def get_performances_data(self):
+        return [
+            {
+                "play": self.validated_data["play"],
+                "theatre_hall": self.validated_data["theatre_hall"],
+                "show_time": show_time,
+            }
+            for show_time in self.validated_data["show_times"]
+        ]
+
+
+class FreeSlotSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+
 class TicketListSerializer(TicketSerializer):
     performance = PerformanceListSerializer(many=False, read_only=True)
 
 
+class ReservationTicketSerializer(serializers.ModelSerializer):
+    """
+    Ticket payload of a reservation.
+
+    Seats are validated for the whole reservation at once in
+    ReservationSerializer.validate_tickets instead of per ticket.
+    """
+    performance = serializers.IntegerField(source="performance_id")
+
+    class Meta:
+        model = Ticket
+        fields = ("id", "row", "seat", "performance")
+
+
 class ReservationSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = ReservationTicketSerializer(many=True, read_only=False, allow_empty=False)
 
     class Meta:
         model = Reservation
         fields = ("id", "created_at", "tickets")
 
+    def validate_tickets(self, tickets_data):
+        request = self.context.get("request")
+        errors = ticket_errors(
+            tickets_data,
+            serializers.ValidationError,
+            hold_backend=get_hold_backend(),
+            user_id=request.user.id if request else None
+        )
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return tickets_data
+
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop('tickets')
-            reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
-            return reservation
+        try:
+            with transaction.atomic():
+                tickets_data = validated_data.pop('tickets')
+                reservation = Reservation.objects.create(**validated_data)
+                create_tickets(reservation, tickets_data)
+                return reservation
+        except IntegrityError as error:
+            # Sold meanwhile, after validate_tickets() found it free
+            if not is_seat_taken(error):
+                raise
+            raise serializers.ValidationError({"tickets": [UNIQUE_SEAT_MESSAGE]})
 
 
 class ReservationDetailSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    token = serializers.CharField(read_only=True)
+    expires_at = serializers.DateTimeField(read_only=True)
+    tickets = ReservationTicketSerializer(many=True, allow_empty=False)
+
+    def validate_tickets(self, tickets_data):
+        errors = ticket_errors(tickets_data, serializers.ValidationError)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return tickets_data
@@ -0,0 +1,136 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from service.cache import invalidate
+from service.counters import adjust_tickets_sold
+from service.listings import forget_listing, refresh_listings, rename_play_listings, update_hall_listings
+from service.models import Actor, Genre, Play, Performance, TheatreHall, Ticket
+from service.scheduling import reschedule_play
+from service.search import play_search_vector, actor_search_vector
+
+CATALOGUE_CACHE_GROUPS = {
+    Actor: "actors",
+    Genre: "genres",
+    Play: "plays",
+    TheatreHall: "theatre_halls",
+}
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_performance(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_performance_id = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("performance_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def count_saved_ticket(sender, instance, created, **kwargs):
+    if created:
+        adjust_tickets_sold(instance.performance_id, 1)
+        return
+
+    previous_performance_id = getattr(instance, "_previous_performance_id", None)
+    if previous_performance_id != instance.performance_id:
+        if previous_performance_id is not None:
+            adjust_tickets_sold(previous_performance_id, -1)
+        adjust_tickets_sold(instance.performance_id, 1)
+
+
+@receiver(pre_save, sender=Play)
+def remember_play_runtime(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_runtime = (
+            Play.objects.filter(pk=instance.pk)
+            .values_list("runtime", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Play)
+def reschedule_play_performances(sender, instance, created, **kwargs):
+    # ends_at is stored, so it is moved with the runtime it derives from
+    previous_runtime = getattr(instance, "_previous_runtime", None)
+    if not created and previous_runtime is not None and previous_runtime != instance.runtime:
+        refresh_listings(reschedule_play(instance))
+
+
+@receiver(post_delete, sender=Ticket)
+def count_deleted_ticket(sender, instance, **kwargs):
+    adjust_tickets_sold(instance.performance_id, -1)
+
+
+@receiver(post_save, sender=Performance)
+def refresh_performance_listing(sender, instance, **kwargs):
+    refresh_listings([instance.pk])
+
+
+@receiver(post_delete, sender=Performance)
+def forget_performance_listing(sender, instance, **kwargs):
+    forget_listing(instance.pk)
+
+
+@receiver(post_save, sender=Play)
+def refresh_play_listings(sender, instance, **kwargs):
+    rename_play_listings(instance)
+
+
+@receiver(post_save, sender=TheatreHall)
+def refresh_theatre_hall_listings(sender, instance, **kwargs):
+    update_hall_listings(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalogue_cache(sender, **kwargs):
+    group = CATALOGUE_CACHE_GROUPS.get(sender)
+    if group is not None:
+        invalidate(group)
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def invalidate_play_relations_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    # m2m writes do not go through Play.save, so updated_at is moved by hand.
+    # A reverse clear does not report the affected plays, so they are
+    # looked up before the rows are gone.
+    if reverse and action == "pre_clear":
+        relation = "actors" if sender is Play.actors.through else "genres"
+        Play.objects.filter(**{relation: instance}).update(updated_at=timezone.now())
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        Play.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif pk_set:
+        Play.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+
+    invalidate("plays")
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+@receiver(pre_delete, sender=Genre)
+def touch_related_plays(sender, instance, created=False, **kwargs):
+    # Plays show the names of their actors and genres, so their updated_at,
+    # which their ETags derive from, moves with them
+    if created:
+        return
+
+    relation = "actors" if sender is Actor else "genres"
+    Play.objects.filter(**{relation: instance}).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Play)
+def update_play_search_vector(sender, instance, **kwargs):
+    Play.objects.filter(pk=instance.pk).update(search_vector=play_search_vector())
+
+
+@receiver(post_save, sender=Actor)
+def update_actor_search_vector(sender, instance, **kwargs):
+    Actor.objects.filter(pk=instance.pk).update(search_vector=actor_search_vector())
@@ -0,0 +1,52 @@
+import hashlib
+import os
+import time
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.http import http_date
+from django.views.static import serve
+
+# Content-addressed files never change, so clients may keep them for good
+IMMUTABLE_CACHE_SECONDS = 365 * 24 * 60 * 60
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage naming files by the SHA-256 of their content, in the
+    directory upload_to chose and with its extension.
+
+    Saving content that is already stored returns the existing name
+    without writing, so identical uploads share one file, and a name always
+    points at the same bytes. Files are never overwritten; gc_media removes
+    the ones nothing refers to.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        directory, filename = os.path.split(name)
+        _, extension = os.path.splitext(filename)
+
+        name = os.path.join(directory, f"{content_hash(content)}{extension.lower()}")
+        if self.exists(name):
+            return name
+
+        return super().save(name, content, max_length)
+
+
+def serve_media(request, path):
+    """django.views.static.serve with headers for caching files forever."""
+    response = serve(request, path, document_root=default_storage.location)
+    response["Cache-Control"] = f"public, max-age={IMMUTABLE_CACHE_SECONDS}, immutable"
+    response["Expires"] = http_date(time.time() + IMMUTABLE_CACHE_SECONDS)
+    return response
@@ -0,0 +1,140 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from service.models import Actor, Genre, Play, Performance, Reservation, TheatreHall, Ticket
+from service.throttling import SlidingWindowUserThrottle, local_tier
+
+ASYNC_PLAY_URL = reverse("service:async-play-list")
+ASYNC_PERFORMANCE_URL = reverse("service:async-performance-list")
+PERFORMANCE_URL = reverse("service:performance-list")
+
+
+def async_seat_map(performance_id: int):
+    return reverse("service:async-performance-seat-map", args=[performance_id])
+
+
+class AsyncApiTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.headers = {"authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+        self.drama = Genre.objects.create(name="Drama")
+        self.actor = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        self.plays = [
+            Play.objects.create(title=f"Play {index}", description="Film")
+            for index in range(3)
+        ]
+        self.plays[1].genres.add(self.drama)
+        self.plays[1].actors.add(self.actor)
+
+        self.theatre_hall = TheatreHall.objects.create(name="Blue", rows=2, seats_in_row=5)
+        self.performances = [
+            Performance.objects.create(
+                play=play,
+                theatre_hall=self.theatre_hall,
+                show_time=timezone.make_aware(datetime(2030, 1, day + 1, 19, 0)),
+            )
+            for day, play in enumerate(self.plays)
+        ]
+
+    async def get_all(self, url, **params):
+        results = []
+        response = await self.async_client.get(url, params, headers=self.headers)
+
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results += response.json()["results"]
+
+            if not response.json()["next"]:
+                return results
+            response = await self.async_client.get(response.json()["next"], headers=self.headers)
+
+    async def test_play_list(self):
+        plays = await self.get_all(ASYNC_PLAY_URL, page_size=2)
+
+        self.assertEqual([play["id"] for play in plays], [play.id for play in self.plays])
+        self.assertEqual(plays[1]["actors"], ["Oleg Gordienko"])
+        self.assertEqual(plays[1]["genres"], ["Drama"])
+
+    async def test_play_list_filters(self):
+        plays = await self.get_all(ASYNC_PLAY_URL, genres=self.drama.id)
+
+        self.assertEqual([play["id"] for play in plays], [self.plays[1].id])
+
+    def test_performance_list_matches_sync_list(self):
+        response = self.client.get(ASYNC_PERFORMANCE_URL, headers=self.headers)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(
+            response.json()["results"],
+            client.get(PERFORMANCE_URL).json()["results"]
+        )
+
+    async def test_performance_list_filters(self):
+        performances = await self.get_all(ASYNC_PERFORMANCE_URL, play=self.plays[0].id)
+
+        self.assertEqual([performance["id"] for performance in performances], [self.performances[0].id])
+
+        response = await self.async_client.get(ASYNC_PERFORMANCE_URL, {"hall": "x"}, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_seat_map(self):
+        reservation = await Reservation.objects.acreate(user=self.user)
+        await Ticket.objects.acreate(
+            row=1, seat=1, performance=self.performances[0], reservation=reservation
+        )
+
+        response = await self.async_client.get(async_seat_map(self.performances[0].id), headers=self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["seat_map"], "gAA=")
+
+    async def test_unknown_performance(self):
+        response = await self.async_client.get(async_seat_map(0), headers=self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_invalid_cursor(self):
+        response = await self.async_client.get(
+            ASYNC_PERFORMANCE_URL, {"cursor": "nonsense"}, headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_auth_required(self):
+        response = await self.async_client.get(ASYNC_PLAY_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get(ASYNC_PLAY_URL, headers={"authorization": "Bearer nonsense"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_read_only(self):
+        response = await self.async_client.post(ASYNC_PLAY_URL, {}, headers=self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @patch.dict(SlidingWindowUserThrottle.THROTTLE_RATES, {"user": "2/min"})
+    async def test_throttled(self):
+        caches[settings.THROTTLE_CACHE].clear()
+        local_tier.clear()
+
+        for _ in range(2):
+            response = await self.async_client.get(ASYNC_PLAY_URL, headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = await self.async_client.get(ASYNC_PLAY_URL, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
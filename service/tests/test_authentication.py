@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from service.cache import catalogue_cache
+from service.models import Genre
+
+GENRE_URL = reverse("service:genre-list")
+RESERVATION_URL = reverse("service:reservation-list")
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345",
+            is_staff=True
+        )
+        self.access = self.client.post(
+            TOKEN_URL, {"email": "test@gmail.com", "password": "test12345"}
+        ).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+    def test_token_carries_claims(self):
+        token = AccessToken(self.access)
+
+        self.assertIs(token["is_staff"], True)
+        self.assertIs(token["is_active"], True)
+
+        refresh = self.client.post(TOKEN_URL, {"email": "test@gmail.com", "password": "test12345"}).data["refresh"]
+        access = self.client.post(TOKEN_REFRESH_URL, {"refresh": refresh}).data["access"]
+        self.assertIs(AccessToken(access)["is_staff"], True)
+
+    def test_no_user_query_once_cached(self):
+        self.client.get(RESERVATION_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries if "user_user" in query["sql"]])
+
+    def test_staff_claim_allows_writes(self):
+        response = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get(RESERVATION_URL).status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(RESERVATION_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.user.delete()
+
+        self.assertEqual(self.client.get(RESERVATION_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_outdated_staff_claim_is_rejected(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        response = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Genre.objects.exists())
+
+    def test_cached_state_expires(self):
+        self.client.get(RESERVATION_URL)
+        # Changed without signals, e.g. by another service
+        get_user_model().objects.filter(id=self.user.id).update(is_active=False)
+
+        self.assertEqual(self.client.get(RESERVATION_URL).status_code, status.HTTP_200_OK)
+
+        cache.clear()
+        self.assertEqual(self.client.get(RESERVATION_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_claims(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+        response = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
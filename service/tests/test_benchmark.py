@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from service.benchmark import (
+    ClientTransport,
+    compare,
+    default_scenarios,
+    percentile,
+    run_benchmark,
+    run_connection_benchmark,
+    scenario,
+)
+from service.cache import catalogue_cache
+from service.counters import stale_tickets_sold
+from service.management.commands.seed_benchmark import BENCHMARK_USER_EMAIL, BENCHMARK_USER_PASSWORD
+from service.models import Performance, Play, Ticket
+
+
+class SeedBenchmarkTests(TestCase):
+    def setUp(self) -> None:
+        call_command(
+            "seed_benchmark",
+            "--genres=3",
+            "--actors=20",
+            "--plays=10",
+            "--halls=2",
+            "--performances=15",
+            "--tickets=150",
+            "--users=5",
+            "--batch-size=7",
+            stdout=StringIO(),
+        )
+
+    def test_seeded_counters_match_tickets(self):
+        self.assertEqual(Play.objects.count(), 10)
+        self.assertEqual(Performance.objects.count(), 15)
+        self.assertTrue(Ticket.objects.exists())
+        self.assertEqual(stale_tickets_sold(), [])
+
+    def test_client_benchmark_results(self):
+        scenarios = default_scenarios(BENCHMARK_USER_EMAIL, BENCHMARK_USER_PASSWORD)
+
+        results = run_benchmark(ClientTransport(BENCHMARK_USER_EMAIL), scenarios, 3, warmup=1)
+
+        plays = results["scenarios"]["plays"]
+        self.assertEqual(plays["statuses"], {"200": 3})
+        self.assertLessEqual(plays["p50_ms"], plays["p99_ms"])
+        self.assertIsNotNone(plays["queries"])
+        self.assertGreater(plays["peak_memory_kb"], 0)
+        self.assertEqual(results["scenarios"]["token"]["statuses"], {"200": 3})
+
+
+class ConnectionBenchmarkTests(TransactionTestCase):
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+
+    def test_persistent_connections_are_reused(self):
+        get_user_model().objects.create_user(BENCHMARK_USER_EMAIL, BENCHMARK_USER_PASSWORD)
+
+        results = run_connection_benchmark(
+            ClientTransport(BENCHMARK_USER_EMAIL),
+            [scenario("genres", reverse("service:genre-list"))],
+            3,
+            connects=1,
+        )
+
+        profiles = results["profiles"]
+        self.assertEqual(profiles["new connection per request"]["connections"], 3)
+        self.assertEqual(profiles["persistent"]["connections"], 1)
+        self.assertEqual(profiles["persistent with health checks"]["connections"], 1)
+
+
+class BenchmarkHelpersTests(TestCase):
+    def test_percentile(self):
+        samples = list(range(1, 101))
+
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"scenarios": {"plays": {"p95_ms": 10.0, "queries": 2}}}
+        results = {"scenarios": {"plays": {"p95_ms": 13.0, "queries": 3}}}
+
+        self.assertEqual(len(compare(results, baseline, tolerance=0.2)), 2)
+        self.assertEqual(compare(results, baseline, tolerance=0.5), ["plays: queries 2 -> 3"])
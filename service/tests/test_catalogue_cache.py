@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.cache import catalogue_cache
+from service.models import Play, Actor, Genre
+
+PLAY_URL = reverse("service:play-list")
+ACTOR_URL = reverse("service:actor-list")
+
+
+class CatalogueCacheTests(TestCase):
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.actor = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        self.play = Play.objects.create(title="Way", description="Film")
+        self.play.actors.add(self.actor)
+
+    def test_cached_list_skips_database(self):
+        first = self.client.get(PLAY_URL)
+
+        # only the version stamp aggregate for the ETag
+        with self.assertNumQueries(1):
+            second = self.client.get(PLAY_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+
+    def test_query_params_are_part_of_key(self):
+        other = Play.objects.create(title="Wolf", description="Film")
+
+        response = self.client.get(PLAY_URL, {"actors": f"{self.actor.id}"})
+        self.assertEqual([play["id"] for play in response.data], [self.play.id])
+
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(
+            sorted(play["id"] for play in response.data), sorted([self.play.id, other.id])
+        )
+
+    def test_play_save_invalidates(self):
+        self.client.get(PLAY_URL)
+
+        self.play.title = "New way"
+        self.play.save()
+
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response.data[0]["title"], "New way")
+
+    def test_actor_change_invalidates_plays(self):
+        self.client.get(PLAY_URL)
+
+        self.actor.first_name = "Ivan"
+        self.actor.save()
+
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response.data[0]["actors"], ["Ivan Gordienko"])
+
+    def test_m2m_change_invalidates_plays(self):
+        self.client.get(PLAY_URL)
+
+        genre = Genre.objects.create(name="Drama")
+        self.play.genres.add(genre)
+
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response.data[0]["genres"], ["Drama"])
+
+    def test_play_change_keeps_actor_list_cached(self):
+        self.client.get(ACTOR_URL)
+
+        Play.objects.create(title="Wolf", description="Film")
+
+        # ETag stamp only
+        with self.assertNumQueries(1):
+            self.client.get(ACTOR_URL)
@@ -0,0 +1,156 @@
+from datetime import datetime
+
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.cache import catalogue_cache
+from service.models import Play, Actor, TheatreHall, Performance
+
+PLAY_URL = reverse("service:play-list")
+ACTOR_URL = reverse("service:actor-list")
+PERFORMANCE_URL = reverse("service:performance-list")
+RESERVATION_URL = reverse("service:reservation-list")
+
+
+def detail_play(play_id: int):
+    return reverse("service:play-detail", args=[play_id])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.play = Play.objects.create(title="Way", description="Film")
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5),
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19, 0))
+        )
+
+    def test_list_sets_validators(self):
+        response = self.client.get(PLAY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_detail_sets_validators(self):
+        response = self.client.get(detail_play(self.play.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_delete_with_if_modified_since_returns_list(self):
+        other = Play.objects.create(title="Wolf", description="Film")
+        self.client.get(PLAY_URL)
+
+        other.delete()
+
+        # Later than any row was written, as a client would have it
+        response = self.client.get(PLAY_URL, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        # version stamp only, nothing is serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_etag_depends_on_query_params(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        response = self.client.get(PLAY_URL, {"genres": "1"}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_changes_etag(self):
+        etag = self.client.get(detail_play(self.play.id))["ETag"]
+
+        self.play.description = "New film"
+        self.play.save()
+
+        response = self.client.get(detail_play(self.play.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_delete_changes_list_etag(self):
+        other = Play.objects.create(title="Wolf", description="Film")
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        other.delete()
+
+        response = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_actor_added_to_play_changes_etag(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        self.play.actors.add(Actor.objects.create(first_name="Oleg", last_name="Gordienko"))
+
+        response = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_actor_list_etag(self):
+        etag = self.client.get(ACTOR_URL)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(ACTOR_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_actor_etag_follows_database_not_local_cache(self):
+        actor = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        etag = self.client.get(ACTOR_URL)["ETag"]
+
+        # As if another process made the change: this one's cache versions stay put
+        with patch("service.signals.invalidate"):
+            actor.last_name = "Smith"
+            actor.save()
+
+        response = self.client.get(ACTOR_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_actor_rename_changes_play_etag(self):
+        actor = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        self.play.actors.add(actor)
+        etag = self.client.get(detail_play(self.play.id))["ETag"]
+
+        with patch("service.signals.invalidate"):
+            actor.last_name = "Smith"
+            actor.save()
+
+        response = self.client.get(detail_play(self.play.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_ticket_sale_changes_performance_etag(self):
+        etag = self.client.get(PERFORMANCE_URL)["ETag"]
+
+        self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"row": 1, "seat": 1, "performance": self.performance.id}]},
+            format="json"
+        )
+
+        response = self.client.get(PERFORMANCE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.models import Play, TheatreHall, Performance, Reservation, Ticket
+
+
+def export_url(dataset, export_format):
+    return reverse("service:export", args=[dataset, export_format])
+
+
+class ExportApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@gmail.com",
+            "admin12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Way", description="Film"),
+            theatre_hall=TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5),
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19, 0))
+        )
+        self.other_performance = Performance.objects.create(
+            play=Play.objects.create(title="Dawn", description="Play"),
+            theatre_hall=self.performance.theatre_hall,
+            show_time=timezone.make_aware(datetime(2030, 1, 2, 19, 0))
+        )
+        reservation = Reservation.objects.create(user=self.admin)
+        Ticket.objects.create(row=1, seat=1, performance=self.performance, reservation=reservation)
+        Ticket.objects.create(row=1, seat=2, performance=self.performance, reservation=reservation)
+        Ticket.objects.create(row=2, seat=1, performance=self.other_performance, reservation=reservation)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_tickets_csv(self):
+        response = self.client.get(export_url("tickets", "csv"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["play_title"], "Way")
+        self.assertEqual(rows[0]["email"], "admin@gmail.com")
+        self.assertEqual(rows[0]["show_time"], "2030-01-01T19:00:00+00:00")
+
+    def test_empty_csv_has_header(self):
+        Ticket.objects.all().delete()
+
+        response = self.client.get(export_url("tickets", "csv"))
+
+        lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0].split(",")[:3], ["id", "row", "seat"])
+
+    def test_csv_header_matches_rows(self):
+        response = self.client.get(export_url("reservations", "csv"))
+
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+
+        self.assertEqual(list(rows[0]), ["id", "created_at", "tickets_count", "email"])
+        self.assertEqual((rows[0]["tickets_count"], rows[0]["email"]), ("3", "admin@gmail.com"))
+
+    def test_tickets_filtered_by_performance(self):
+        response = self.client.get(
+            export_url("tickets", "ndjson"), {"performances": str(self.other_performance.id)}
+        )
+
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]["row"], rows[0]["seat"]), (2, 1))
+
+    def test_reservations_ndjson(self):
+        response = self.client.get(export_url("reservations", "ndjson"))
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["tickets_count"], 3)
+
+    def test_performance_sales(self):
+        response = self.client.get(export_url("performance-sales", "ndjson"))
+
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+
+        self.assertEqual(
+            [(row["play_title"], row["tickets_sold"], row["capacity"]) for row in rows],
+            [("Way", 2, 15), ("Dawn", 1, 15)]
+        )
+
+    def test_keyset_pages_without_server_side_cursors(self):
+        expected = {
+            dataset: self.read(self.client.get(export_url(dataset, "ndjson")))
+            for dataset in ("tickets", "reservations", "performance-sales")
+        }
+
+        with mock.patch.dict(connection.settings_dict, {"DISABLE_SERVER_SIDE_CURSORS": True}), \
+                mock.patch("service.exports.EXPORT_CHUNK_SIZE", 1):
+            for dataset, content in expected.items():
+                with self.subTest(dataset=dataset):
+                    self.assertEqual(self.read(self.client.get(export_url(dataset, "ndjson"))), content)
+
+    def test_accept_header_does_not_break_export(self):
+        response = self.client.get(export_url("tickets", "csv"), HTTP_ACCEPT="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unknown_export(self):
+        self.assertEqual(
+            self.client.get(export_url("actors", "csv")).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.client.get(export_url("tickets", "xml")).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+    def test_invalid_filter(self):
+        response = self.client.get(export_url("tickets", "csv"), {"performances": "x"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@gmail.com", "test12345")
+        )
+
+        response = self.client.get(export_url("tickets", "csv"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
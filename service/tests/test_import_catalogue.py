@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from service.models import Actor, Genre, Play, Performance, TheatreHall
+from service.search import PLAY_SEARCH_CONFIG, search
+
+
+class ImportCatalogueTests(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def run_import(self, *paths, **options):
+        call_command("import_catalogue", *paths, batch_size=2, stdout=StringIO(), **options)
+
+    def test_import_plays_with_relations(self):
+        plays = self.write("plays.csv", (
+            "title,description,actors,genres\n"
+            "Hamlet,Prince of Denmark,Oleg Gordienko;Anna  Smith,Drama;Tragedy\n"
+            "Way,Road trip,Anna Smith,Drama\n"
+            "Dawn,Morning,,\n"
+        ))
+
+        self.run_import(plays)
+
+        self.assertEqual(Play.objects.count(), 3)
+        self.assertEqual(Actor.objects.count(), 2)
+        self.assertEqual(set(Genre.objects.values_list("name", flat=True)), {"Drama", "Tragedy"})
+        hamlet = Play.objects.get(title="Hamlet")
+        self.assertEqual(
+            set(hamlet.actors.values_list("last_name", flat=True)), {"Gordienko", "Smith"}
+        )
+        self.assertEqual(
+            list(search(Play.objects.all(), "denmark", PLAY_SEARCH_CONFIG, ["title"])),
+            [hamlet]
+        )
+
+    def test_reimport_updates_without_duplicates(self):
+        self.run_import(self.write("plays.csv", "title,description,actors\nHamlet,Old,Oleg Gordienko\n"))
+        self.run_import(self.write("plays.csv", "title,description,actors\nHamlet,New,Oleg Gordienko\n"))
+
+        play = Play.objects.get()
+        self.assertEqual(play.description, "New")
+        self.assertEqual(play.actors.count(), 1)
+        self.assertEqual(Actor.objects.count(), 1)
+
+    def test_import_play_runtime(self):
+        self.run_import(self.write("plays.jsonl", "\n".join(json.dumps(row) for row in [
+            {"title": "Hamlet", "runtime": 150},
+            {"title": "Way"},
+        ])))
+        self.run_import(self.write("plays.csv", "title,description,runtime\nWay,Road trip,95\nHamlet,Prince,\n"))
+
+        self.assertEqual(dict(Play.objects.values_list("title", "runtime")), {"Hamlet": 150, "Way": 95})
+
+    def test_runtime_change_moves_performances(self):
+        self.run_import(
+            self.write("halls.csv", "name,rows,seats_in_row\nBlue,3,5\n"),
+            self.write("plays.csv", "title,runtime\nHamlet,150\n"),
+            self.write("performances.csv", "play,theatre_hall,show_time\nHamlet,Blue,2030-01-01T19:00:00+00:00\n"),
+        )
+        self.run_import(self.write("plays.csv", "title,runtime\nHamlet,90\n"))
+
+        performance = Performance.objects.get()
+        self.assertEqual(performance.ends_at - performance.show_time, timedelta(minutes=90))
+
+    def test_value_too_long_for_column_fails(self):
+        with self.assertRaisesMessage(CommandError, "batch starting at row 1"):
+            self.run_import(self.write("plays.csv", f"title\n{'x' * 64}\n"))
+
+    def test_single_word_actor_name_fails(self):
+        with self.assertRaisesMessage(CommandError, "needs a first and a last name"):
+            self.run_import(self.write("plays.csv", "title,actors\nHamlet,Oleg\n"))
+
+    def test_invalid_runtime_fails(self):
+        with self.assertRaises(CommandError):
+            self.run_import(self.write("plays.csv", "title,runtime\nHamlet,long\n"))
+
+    def test_import_halls_and_performances_in_dependency_order(self):
+        halls = self.write("halls.jsonl", "\n".join(json.dumps(row) for row in [
+            {"name": "Blue", "rows": 10, "seats_in_row": 12},
+            {"name": "Red", "rows": 5, "seats_in_row": 5},
+            {"name": "Blue", "rows": 11, "seats_in_row": 12},
+        ]))
+        performances = self.write("performances.jsonl", "\n".join(json.dumps(row) for row in [
+            {"play": "Hamlet", "theatre_hall": "Blue", "show_time": "2030-01-01T19:00:00+00:00"},
+            {"play": "Hamlet", "theatre_hall": "Red", "show_time": "2030-01-01T19:00:00"},
+            {"play": "Hamlet", "theatre_hall": "Blue", "show_time": "2030-01-01T19:00:00Z"},
+        ]))
+        plays = self.write("plays.jsonl", json.dumps({"title": "Hamlet", "actors": ["Oleg Gordienko"]}))
+
+        self.run_import(performances, plays, halls)
+        self.run_import(performances)
+
+        self.assertEqual(TheatreHall.objects.get(name="Blue").rows, 11)
+        self.assertEqual(Performance.objects.count(), 2)
+        self.assertEqual(set(Performance.objects.values_list("tickets_sold", flat=True)), {0})
+
+    def test_unknown_play_fails(self):
+        performances = self.write(
+            "performances.csv",
+            "play,theatre_hall,show_time\nHamlet,Blue,2030-01-01 19:00\n"
+        )
+
+        with self.assertRaisesMessage(CommandError, "row 1"):
+            self.run_import(performances)
+
+    def test_unknown_file_kind(self):
+        with self.assertRaises(CommandError):
+            self.run_import(self.write("season.csv", "title\nHamlet\n"))
+
+        self.run_import(self.write("season.csv", "title\nHamlet\n"), kind="plays")
+        self.assertTrue(Play.objects.filter(title="Hamlet").exists())
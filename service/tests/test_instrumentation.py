@@ -0,0 +1,107 @@
+import re
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from service.benchmark import queries_from_server_timing
+from service.cache import catalogue_cache
+from service.middleware import QueryBudgetExceeded, request_metrics
+from service.models import Genre
+from service.serializers import GenreSerializer
+
+GENRE_URL = reverse("service:genre-list")
+ASYNC_PLAY_URL = reverse("service:async-play-list")
+METRICS_URL = reverse("service:metrics")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+        request_metrics.reset()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@gmail.com",
+            "admin12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        Genre.objects.create(name="Drama")
+
+    def test_server_timing_header(self):
+        response = self.client.get(GENRE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+        self.assertIn("serialize;dur=", response["Server-Timing"])
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    def test_serialization_time(self):
+        to_representation = GenreSerializer.to_representation
+
+        def slow_to_representation(serializer, instance):
+            time.sleep(0.02)
+            return to_representation(serializer, instance)
+
+        with patch.object(GenreSerializer, "to_representation", slow_to_representation):
+            response = self.client.get(GENRE_URL)
+
+        serialize_ms = float(re.search(r"serialize;dur=([\d.]+)", response["Server-Timing"]).group(1))
+        self.assertGreaterEqual(serialize_ms, 20)
+        self.assertGreaterEqual(request_metrics.snapshot()["service:genre-list"]["serialize_ms"], 20)
+
+    async def test_server_timing_of_async_view(self):
+        response = await self.async_client.get(
+            ASYNC_PLAY_URL,
+            headers={"authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries = queries_from_server_timing(response["Server-Timing"])
+        self.assertGreater(queries, 0)
+        self.assertEqual(request_metrics.snapshot()["service:async-play-list"]["queries"], queries)
+
+    @override_settings(QUERY_BUDGETS={"service:async-play-list": 0}, QUERY_BUDGET_STRICT=True)
+    async def test_budget_of_async_view(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            await self.async_client.get(
+                ASYNC_PLAY_URL,
+                headers={"authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+            )
+
+    def test_metrics_endpoint(self):
+        self.client.get(GENRE_URL)
+        self.client.get(GENRE_URL)
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["service:genre-list"]["requests"], 2)
+
+    def test_metrics_endpoint_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@gmail.com", "test12345")
+        )
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(QUERY_BUDGETS={"GenreModelViewSet.list": 0}, QUERY_BUDGET_STRICT=True)
+    def test_budget_exceeded_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(GENRE_URL)
+
+    @override_settings(QUERY_BUDGETS={"service:genre-list": 0}, QUERY_BUDGET_STRICT=False)
+    def test_budget_exceeded_logs(self):
+        with self.assertLogs("service.middleware", level="WARNING"):
+            response = self.client.get(GENRE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
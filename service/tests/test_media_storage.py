@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.models import Play
+from service.storage import serve_media
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def upload_image_url(play_id: int):
+    return reverse("service:play-upload-image", args=[play_id])
+
+
+def image_file(color):
+    file = BytesIO()
+    Image.new("RGB", (100, 50), color).save(file, "PNG")
+    file.seek(0)
+    file.name = "Poster.PNG"
+    return file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_WORKERS=0)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@gmail.com",
+            "test12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def upload(self, play, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(upload_image_url(play.id), {"image": file}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        play.refresh_from_db()
+        return play.image.name
+
+    def test_identical_uploads_share_a_file(self):
+        first = self.upload(Play.objects.create(title="Way", description="Film"), image_file("red"))
+        second = self.upload(Play.objects.create(title="Gun", description="Film"), image_file("red"))
+        other = self.upload(Play.objects.create(title="Sea", description="Film"), image_file("blue"))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r"^uploads/plays/[0-9a-f]{64}\.png$")
+
+    def test_saving_existing_content_does_not_write(self):
+        name = default_storage.save("uploads/notes.txt", ContentFile(b"text"))
+        os.utime(default_storage.path(name), (0, 0))
+
+        self.assertEqual(default_storage.save("uploads/copy.txt", ContentFile(b"text")), name)
+        self.assertEqual(default_storage.get_modified_time(name).timestamp(), 0)
+
+    def test_media_is_cached_forever(self):
+        name = default_storage.save("uploads/notes.txt", ContentFile(b"text"))
+
+        response = serve_media(RequestFactory().get(f"/media/{name}"), name)
+
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertIn("Expires", response)
+
+    def test_gc_deletes_orphans_only(self):
+        play = Play.objects.create(title="Way", description="Film")
+        replaced = self.upload(play, image_file("red"))
+        replaced_variants = [
+            name for names in play.image_variants.values() for name in names.values()
+        ]
+        kept = self.upload(play, image_file("blue"))
+        kept_variants = [
+            name for names in play.image_variants.values() for name in names.values()
+        ]
+
+        call_command("gc_media", min_age=0, stdout=StringIO())
+
+        for name in [kept, *kept_variants]:
+            self.assertTrue(default_storage.exists(name), name)
+        for name in [replaced, *replaced_variants]:
+            self.assertFalse(default_storage.exists(name), name)
+
+    def test_gc_spares_new_files(self):
+        name = default_storage.save("uploads/plays/new.png", ContentFile(b"upload"))
+
+        call_command("gc_media", stdout=StringIO())
+
+        self.assertTrue(default_storage.exists(name))
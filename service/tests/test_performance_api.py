@@ -0,0 +1,641 @@
+import base64
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.counters import adjust_tickets_sold
+from service.models import Play, TheatreHall, Performance, PerformanceListing, Reservation, Ticket
+from service.seat_map import build_seat_bitmap
+from service.serializers import PerformanceSerializer
+
+PERFORMANCE_URL = reverse("service:performance-list")
+PERFORMANCE_BULK_URL = reverse("service:performance-bulk")
+RESERVATION_URL = reverse("service:reservation-list")
+
+
+def detail_performance(performance_id: int):
+    return reverse("service:performance-detail", args=[performance_id])
+
+
+def detail_play(play_id: int):
+    return reverse("service:play-detail", args=[play_id])
+
+
+def free_slots_hall(theatre_hall_id: int):
+    return reverse("service:theatrehall-free-slots", args=[theatre_hall_id])
+
+
+def seat_map_performance(performance_id: int):
+    return reverse("service:performance-seat-map", args=[performance_id])
+
+
+def template_performance(**params):
+    play = Play.objects.create(title=params.pop("title", "Way"), description="Film")
+    theatre_hall = TheatreHall.objects.create(
+        name=params.pop("hall_name", "Blue"), rows=3, seats_in_row=5
+    )
+
+    default = {
+        "play": play,
+        "theatre_hall": theatre_hall,
+        "show_time": timezone.make_aware(datetime(2030, 1, 1, 19, 0)),
+    }
+    default.update(**params)
+
+    return Performance.objects.create(**default)
+
+
+class SeatBitmapTests(TestCase):
+    def test_build_seat_bitmap(self):
+        bitmap = build_seat_bitmap(3, 5, [(1, 1), (2, 3), (3, 5)])
+
+        self.assertEqual(len(bitmap), 2)
+        self.assertEqual(bitmap, bytes([0b10000001, 0b00000010]))
+
+    def test_build_empty_seat_bitmap(self):
+        self.assertEqual(build_seat_bitmap(2, 2, []), bytes(1))
+
+
+class AuthenticatedPerformanceApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.performance = template_performance()
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, performance=self.performance, reservation=reservation)
+        Ticket.objects.create(row=2, seat=3, performance=self.performance, reservation=reservation)
+
+    def test_seat_map(self):
+        response = self.client.get(seat_map_performance(self.performance.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], 3)
+        self.assertEqual(response.data["seats_in_row"], 5)
+        self.assertEqual(response.data["encoding"], "base64")
+        self.assertEqual(
+            base64.b64decode(response.data["seat_map"]),
+            build_seat_bitmap(3, 5, [(1, 1), (2, 3)])
+        )
+
+    def test_seat_map_raw(self):
+        response = self.client.get(
+            seat_map_performance(self.performance.id), {"encoding": "raw"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response.content, build_seat_bitmap(3, 5, [(1, 1), (2, 3)]))
+
+    def test_retrieve_performance_with_seat_map(self):
+        response = self.client.get(
+            detail_performance(self.performance.id), {"seat_map": "true"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("tickets", response.data)
+        self.assertEqual(
+            base64.b64decode(response.data["seat_map"]),
+            build_seat_bitmap(3, 5, [(1, 1), (2, 3)])
+        )
+
+    def test_retrieve_performance_with_tickets(self):
+        response = self.client.get(detail_performance(self.performance.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["tickets"]), 2)
+        self.assertNotIn("seat_map", response.data)
+
+
+class TicketsSoldCounterTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = template_performance()
+
+    def reserve(self, *seats):
+        return self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "performance": self.performance.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json"
+        )
+
+    def test_reservation_increments_counter(self):
+        response = self.reserve((1, 1), (1, 2))
+        self.performance.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_deleting_reservation_decrements_counter(self):
+        response = self.reserve((1, 1), (1, 2))
+        Reservation.objects.get(id=response.data["id"]).delete()
+        self.performance.refresh_from_db()
+
+        self.assertEqual(self.performance.tickets_sold, 0)
+
+    def test_deleting_ticket_decrements_counter(self):
+        self.reserve((1, 1), (1, 2))
+        Ticket.objects.filter(row=1, seat=2).delete()
+        self.performance.refresh_from_db()
+
+        self.assertEqual(self.performance.tickets_sold, 1)
+
+    def test_list_reads_counter(self):
+        self.reserve((1, 1), (1, 2), (2, 2))
+
+        response = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["tickets_available"], 12)
+
+    def test_rebuild_ticket_counters(self):
+        self.reserve((1, 1), (1, 2))
+        Performance.objects.update(tickets_sold=7)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_ticket_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_ticket_counters", stdout=StringIO())
+        call_command("rebuild_ticket_counters", "--check", stdout=StringIO())
+        self.performance.refresh_from_db()
+
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+
+class PerformancePaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        first = template_performance()
+        # Equal show times, in separate halls so they do not overlap
+        self.performances = [first] + [
+            Performance.objects.create(
+                play=first.play,
+                theatre_hall=TheatreHall.objects.create(name=f"Hall {day}", rows=3, seats_in_row=5),
+                show_time=timezone.make_aware(datetime(2030, 1, day % 3 + 2, 19, 0))
+            )
+            for day in range(4)
+        ]
+
+    def test_cursor_walks_every_performance_once(self):
+        seen = []
+        response = self.client.get(PERFORMANCE_URL, {"page_size": 2})
+
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [performance["id"] for performance in response.data["results"]]
+
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        expected = sorted(self.performances, key=lambda performance: (performance.show_time, performance.id))
+        self.assertEqual(seen, [performance.id for performance in expected])
+
+    def test_ticket_list_is_paginated(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, performance=self.performances[0], reservation=reservation)
+
+        response = self.client.get(reverse("service:ticket-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["performance"]["tickets_available"], 14)
+
+    def test_ticket_list_shows_own_tickets(self):
+        other = get_user_model().objects.create_user("other@gmail.com", "other12345")
+        own = Ticket.objects.create(
+            row=1, seat=1, performance=self.performances[0], reservation=Reservation.objects.create(user=self.user)
+        )
+        Ticket.objects.create(
+            row=1, seat=2, performance=self.performances[0], reservation=Reservation.objects.create(user=other)
+        )
+
+        response = self.client.get(reverse("service:ticket-list"))
+        self.assertEqual([ticket["id"] for ticket in response.data["results"]], [own.id])
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("service:ticket-list"))
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_tickets_are_read_only(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.post(reverse("service:ticket-list"), {
+            "row": 1, "seat": 1, "performance": self.performances[0].id
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class PerformanceFilterTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.past = template_performance(show_time=timezone.now() - timedelta(days=1))
+        self.hamlet = Play.objects.create(title="Hamlet", description="Prince")
+        self.red = TheatreHall.objects.create(name="Red", rows=1, seats_in_row=2)
+        self.first = template_performance(title="Dawn", hall_name="Green")
+        self.second = Performance.objects.create(
+            play=self.hamlet,
+            theatre_hall=self.red,
+            show_time=timezone.make_aware(datetime(2030, 1, 2, 19, 0)),
+        )
+        self.third = Performance.objects.create(
+            play=self.hamlet,
+            theatre_hall=self.first.theatre_hall,
+            show_time=timezone.make_aware(datetime(2030, 1, 3, 19, 0)),
+        )
+
+    def listed(self, **params):
+        response = self.client.get(PERFORMANCE_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [performance["id"] for performance in response.data["results"]]
+
+    def test_upcoming_by_default(self):
+        self.assertEqual(self.listed(), [self.first.id, self.second.id, self.third.id])
+
+    def test_past_performances_with_window(self):
+        self.assertEqual(
+            self.listed(**{"from": "2000-01-01", "to": "2030-01-02"}),
+            [self.past.id, self.first.id]
+        )
+        self.assertEqual(self.listed(to="2030-01-02"), [self.past.id, self.first.id])
+
+    def test_past_performance_detail(self):
+        response = self.client.get(detail_performance(self.past.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_filter_by_date(self):
+        self.assertEqual(self.listed(date="2030-01-02"), [self.second.id])
+
+    def test_filter_by_play_and_hall(self):
+        self.assertEqual(self.listed(play=self.hamlet.id), [self.second.id, self.third.id])
+        self.assertEqual(
+            self.listed(hall=f"{self.first.theatre_hall.id},{self.red.id}", play=self.hamlet.id),
+            [self.second.id, self.third.id]
+        )
+        self.assertEqual(self.listed(hall=self.red.id), [self.second.id])
+
+    def test_available_only(self):
+        adjust_tickets_sold(self.second.id, 2)
+
+        self.assertEqual(self.listed(available_only="true"), [self.first.id, self.third.id])
+
+    def test_invalid_filters(self):
+        for params in (
+            {"date": "2030-01-32"},
+            {"date": "2030-01-01", "from": "2030-01-01"},
+            {"from": "2030-01-02", "to": "2030-01-01"},
+            {"to": "soon"},
+            {"play": "hamlet"},
+            {"hall": "0"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(PERFORMANCE_URL, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PerformanceBulkApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@gmail.com",
+            "admin12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+        self.performance = template_performance()
+        self.play = self.performance.play
+        self.theatre_hall = self.performance.theatre_hall
+        self.start = timezone.make_aware(datetime(2030, 2, 1, 19, 0))
+
+    def item(self, show_time, **params):
+        return {
+            "play": params.get("play", self.play.id),
+            "theatre_hall": params.get("theatre_hall", self.theatre_hall.id),
+            "show_time": show_time.isoformat(),
+        }
+
+    def test_bulk_create_list(self):
+        payload = [self.item(self.start + timedelta(days=day)) for day in range(3)]
+
+        # savepoint, hall lock, plays, booked range, insert, listings read
+        # and upsert, release
+        with self.assertNumQueries(8):
+            response = self.client.post(PERFORMANCE_BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Performance.objects.count(), 4)
+
+    def test_bulk_create_recurrence(self):
+        response = self.client.post(PERFORMANCE_BULK_URL, {
+            "play": self.play.id,
+            "theatre_hall": self.theatre_hall.id,
+            "start": self.start.isoformat(),
+            "frequency": "daily",
+            "count": 90,
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        show_times = sorted(
+            Performance.objects.exclude(id=self.performance.id).values_list("show_time", flat=True)
+        )
+        self.assertEqual(len(show_times), 90)
+        self.assertEqual(show_times[-1], self.start + timedelta(days=89))
+
+    def test_bulk_create_weekly_until(self):
+        response = self.client.post(PERFORMANCE_BULK_URL, {
+            "play": self.play.id,
+            "theatre_hall": self.theatre_hall.id,
+            "start": self.start.isoformat(),
+            "frequency": "weekly",
+            "until": (self.start + timedelta(days=28)).isoformat(),
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+
+    def test_double_booking_with_existing_performance(self):
+        payload = [
+            self.item(self.start),
+            self.item(self.performance.show_time + timedelta(hours=1)),
+        ]
+
+        response = self.client.post(PERFORMANCE_BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("show_time", response.data[1])
+        self.assertEqual(Performance.objects.count(), 1)
+
+    def test_double_booking_inside_request(self):
+        other_hall = TheatreHall.objects.create(name="Red", rows=3, seats_in_row=5)
+        payload = [
+            self.item(self.start),
+            self.item(self.start, theatre_hall=other_hall.id),
+            self.item(self.start + timedelta(hours=2)),
+        ]
+
+        response = self.client.post(PERFORMANCE_BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[:2], [{}, {}])
+        self.assertIn("show_time", response.data[2])
+
+    def test_unknown_play(self):
+        response = self.client.post(
+            PERFORMANCE_BULK_URL, [self.item(self.start, play=999)], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("play", response.data[0])
+
+    def test_invalid_recurrence(self):
+        rule = {
+            "play": self.play.id,
+            "theatre_hall": self.theatre_hall.id,
+            "start": self.start.isoformat(),
+        }
+
+        self.assertEqual(
+            self.client.post(PERFORMANCE_BULK_URL, rule, format="json").status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.post(PERFORMANCE_BULK_URL, dict(rule, count=5000), format="json").status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.post(PERFORMANCE_BULK_URL, [], format="json").status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_bulk_create_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@gmail.com", "test12345")
+        )
+
+        response = self.client.post(PERFORMANCE_BULK_URL, [self.item(self.start)], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class HallScheduleTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@gmail.com",
+            "admin12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+        self.performance = template_performance()
+        self.play = self.performance.play
+        self.theatre_hall = self.performance.theatre_hall
+        self.show_time = self.performance.show_time
+
+    def payload(self, show_time, play=None):
+        return {
+            "play": (play or self.play).id,
+            "theatre_hall": self.theatre_hall.id,
+            "show_time": show_time.isoformat(),
+        }
+
+    def test_ends_at_follows_play_runtime(self):
+        self.assertEqual(self.performance.ends_at, self.show_time + timedelta(minutes=180))
+
+    def test_runtime_change_moves_ends_at(self):
+        response = self.client.patch(detail_play(self.play.id), {"runtime": 120}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.ends_at, self.show_time + timedelta(minutes=120))
+        self.assertEqual(
+            PerformanceListing.objects.get(id=self.performance.id).ends_at,
+            self.show_time + timedelta(minutes=120)
+        )
+
+    def test_runtime_change_rejected_when_performances_would_overlap(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=self.show_time + timedelta(hours=3),
+        )
+
+        response = self.client.patch(detail_play(self.play.id), {"runtime": 200}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("runtime", response.data)
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.runtime, 180)
+
+    def test_database_rejects_overlap(self):
+        with self.assertRaises(IntegrityError):
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.theatre_hall,
+                show_time=self.show_time + timedelta(hours=2),
+            )
+
+    def test_create_overlapping_performance(self):
+        response = self.client.post(
+            PERFORMANCE_URL, self.payload(self.show_time + timedelta(hours=2)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("show_time", response.data)
+
+    def test_constraint_catches_overlap_missed_by_validation(self):
+        with patch("service.serializers.hall_is_booked", return_value=False):
+            response = self.client.post(
+                PERFORMANCE_URL, self.payload(self.show_time + timedelta(hours=2)), format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("show_time", response.data)
+
+    def test_other_integrity_errors_are_not_reported_as_double_booking(self):
+        serializer = PerformanceSerializer(data=self.payload(self.show_time + timedelta(days=1)))
+        serializer.is_valid(raise_exception=True)
+
+        with patch.object(Performance, "save", side_effect=IntegrityError("null value")):
+            with self.assertRaises(IntegrityError):
+                serializer.save()
+
+    def test_create_right_after_previous_performance(self):
+        response = self.client.post(
+            PERFORMANCE_URL, self.payload(self.show_time + timedelta(hours=3)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_short_play_fits_before_existing_performance(self):
+        short = Play.objects.create(title="Short", description="One act", runtime=60)
+
+        response = self.client.post(
+            PERFORMANCE_URL, self.payload(self.show_time - timedelta(hours=1), play=short), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["ends_at"], self.show_time.isoformat().replace("+00:00", "Z"))
+
+    def test_move_performance_within_own_slot(self):
+        response = self.client.patch(
+            detail_performance(self.performance.id),
+            {"show_time": (self.show_time + timedelta(minutes=30)).isoformat()},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.ends_at, self.show_time + timedelta(minutes=210))
+
+    def test_bulk_uses_play_runtime(self):
+        short = Play.objects.create(title="Short", description="One act", runtime=60)
+        start = self.show_time + timedelta(days=1)
+
+        response = self.client.post(PERFORMANCE_BULK_URL, [
+            self.payload(start, play=short),
+            self.payload(start + timedelta(hours=1), play=short),
+            self.payload(start + timedelta(hours=1, minutes=30), play=short),
+        ], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[:2], [{}, {}])
+        self.assertIn("show_time", response.data[2])
+
+    def test_free_slots(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=self.show_time + timedelta(hours=4),
+        )
+
+        response = self.client.get(free_slots_hall(self.theatre_hall.id), {
+            "from": (self.show_time - timedelta(hours=2)).isoformat(),
+            "to": (self.show_time + timedelta(hours=10)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(slot["start"], slot["end"]) for slot in response.data],
+            [
+                ("2030-01-01T17:00:00Z", "2030-01-01T19:00:00Z"),
+                ("2030-01-01T22:00:00Z", "2030-01-01T23:00:00Z"),
+                ("2030-01-02T02:00:00Z", "2030-01-02T05:00:00Z"),
+            ]
+        )
+
+    def test_free_slots_min_duration(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=self.show_time + timedelta(hours=4),
+        )
+
+        response = self.client.get(free_slots_hall(self.theatre_hall.id), {
+            "from": "2030-01-01",
+            "to": "2030-01-02",
+            "min_duration": 90,
+        })
+
+        self.assertEqual(
+            [(slot["start"], slot["end"]) for slot in response.data],
+            [("2030-01-01T00:00:00Z", "2030-01-01T19:00:00Z")]
+        )
+
+    def test_free_slots_invalid_window(self):
+        url = free_slots_hall(self.theatre_hall.id)
+
+        self.assertEqual(
+            self.client.get(url, {"from": "2030-01-02", "to": "2030-01-01"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(url, {"from": "tomorrow"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get(url, {"from": "2030-01-01", "to": "2031-01-01"}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,120 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.models import Play, Performance, PerformanceListing, Reservation, TheatreHall, Ticket
+from service.serializers import PerformanceListSerializer
+
+PERFORMANCE_URL = reverse("service:performance-list")
+
+
+class PerformanceListingTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.play = Play.objects.create(title="Way", description="Film")
+        self.hall = TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5)
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19, 0))
+        )
+
+    def listing(self):
+        return PerformanceListing.objects.get(id=self.performance.id)
+
+    def sell(self, row, seat):
+        return Ticket.objects.create(
+            row=row,
+            seat=seat,
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.user)
+        )
+
+    def test_list_matches_serializer(self):
+        self.sell(1, 1)
+
+        response = self.client.get(PERFORMANCE_URL)
+
+        performances = Performance.objects.select_related("play", "theatre_hall")
+        self.assertEqual(
+            response.data["results"],
+            [dict(item) for item in PerformanceListSerializer(performances, many=True).data]
+        )
+
+    def test_list_reads_one_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        reads = [query["sql"] for query in queries if "service_performancelisting" in query["sql"]]
+        self.assertTrue(reads)
+        for sql in reads:
+            self.assertNotIn("JOIN", sql)
+
+    def test_follows_tickets(self):
+        ticket = self.sell(1, 1)
+        self.sell(1, 2)
+        self.assertEqual((self.listing().tickets_sold, self.listing().tickets_available), (2, 13))
+
+        ticket.delete()
+        self.assertEqual((self.listing().tickets_sold, self.listing().tickets_available), (1, 14))
+
+        self.performance.refresh_from_db()
+        self.assertEqual(self.listing().updated_at, self.performance.updated_at)
+
+    def test_follows_play_and_hall(self):
+        self.sell(1, 1)
+
+        self.play.title = "New way"
+        self.play.save()
+        self.hall.name = "Red"
+        self.hall.rows = 4
+        self.hall.save()
+
+        listing = self.listing()
+        self.assertEqual(listing.play_title, "New way")
+        self.assertEqual(listing.theatre_hall_name, "Red")
+        self.assertEqual((listing.num_of_seats, listing.tickets_available), (20, 19))
+
+    def test_follows_performance(self):
+        later = timezone.make_aware(datetime(2030, 1, 2, 19, 0))
+        self.performance.show_time = later
+        self.performance.save()
+        self.assertEqual(self.listing().show_time, later)
+
+        self.play.delete()
+        self.assertFalse(PerformanceListing.objects.exists())
+
+    def test_rebuild(self):
+        PerformanceListing.objects.filter(id=self.performance.id).update(play_title="Stale")
+        PerformanceListing.objects.create(
+            **{
+                field.name: getattr(self.listing(), field.name)
+                for field in PerformanceListing._meta.fields
+            } | {"id": 0}
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_performance_listings", check=True, stdout=StringIO())
+
+        call_command("rebuild_performance_listings", stdout=StringIO())
+
+        self.assertEqual(list(PerformanceListing.objects.values_list("id", "play_title")), [
+            (self.performance.id, "Way")
+        ])
+        call_command("rebuild_performance_listings", check=True, stdout=StringIO())
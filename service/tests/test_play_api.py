@@ -4,6 +4,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from service.cache import catalogue_cache
 from service.models import Play, Actor, Genre
 from service.serializers import PlaySerializer, PlayListSerializer, PlayDetailSerializer
 
@@ -27,6 +28,7 @@ def template_play(**params):
 
 class UnauthenticatedPlayApiTests(TestCase):
     def setUp(self) -> None:
+        catalogue_cache().clear()
         self.client = APIClient()
 
     def test_auth_required(self):
@@ -36,6 +38,7 @@ class UnauthenticatedPlayApiTests(TestCase):
 
 class AuthenticatedPlayApiTests(TestCase):
     def setUp(self) -> None:
+        catalogue_cache().clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@gmail.com"
@@ -114,6 +117,67 @@ class AuthenticatedPlayApiTests(TestCase):
         self.assertNotIn(serializer1.data, response.data)
         self.assertIn(serializer2.data, response.data)
 
+    def test_list_plays_by_several_actors_is_distinct(self):
+        play = template_play(title="The gun")
+        actor1 = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        actor2 = Actor.objects.create(first_name="John", last_name="Gordienko")
+        play.actors.add(actor1, actor2)
+
+        response = self.client.get(PLAY_URL, {"actors": f"{actor1.id},{actor2.id}"})
+
+        self.assertEqual([item["id"] for item in response.data], [play.id])
+
+    def test_list_plays_by_all_actors(self):
+        play_with_both = template_play(title="The gun")
+        play_with_one = template_play(title="The wolf")
+        actor1 = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        actor2 = Actor.objects.create(first_name="John", last_name="Gordienko")
+        play_with_both.actors.add(actor1, actor2)
+        play_with_one.actors.add(actor1)
+
+        response = self.client.get(
+            PLAY_URL, {"actors": f"{actor1.id},{actor2.id}", "actors_mode": "all"}
+        )
+
+        self.assertEqual([item["id"] for item in response.data], [play_with_both.id])
+
+    def test_list_plays_by_all_genres(self):
+        play_with_both = template_play(title="The gun")
+        play_with_one = template_play(title="The wolf")
+        genre1 = Genre.objects.create(name="Comedy")
+        genre2 = Genre.objects.create(name="Drama")
+        play_with_both.genres.add(genre1, genre2)
+        play_with_one.genres.add(genre2)
+
+        response = self.client.get(
+            PLAY_URL, {"genres": f"{genre1.id},{genre2.id}", "genres_mode": "all"}
+        )
+
+        self.assertEqual([item["id"] for item in response.data], [play_with_both.id])
+
+    def test_list_plays_with_invalid_ids(self):
+        response = self.client.get(PLAY_URL, {"actors": "1,abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("actors", response.data)
+
+    def test_list_plays_with_non_ascii_digits(self):
+        response = self.client.get(PLAY_URL, {"actors": "²"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("actors", response.data)
+
+    def test_list_plays_with_id_out_of_range(self):
+        response = self.client.get(PLAY_URL, {"genres": str(2 ** 63)})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("genres", response.data)
+
+    def test_list_plays_with_invalid_mode(self):
+        response = self.client.get(PLAY_URL, {"genres": "1", "genres_mode": "some"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_retrieve_play_detail(self):
         play = template_play()
         play.actors.add(Actor.objects.create(first_name="Oleg", last_name="Gordienko"))
@@ -141,6 +205,7 @@ class AuthenticatedPlayApiTests(TestCase):
 
 class AdminPlatApiTests(TestCase):
     def setUp(self) -> None:
+        catalogue_cache().clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "admin1@gmail.com",
@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.cache import catalogue_cache
+from service.images import process_play_image
+from service.models import Play
+
+PLAY_URL = reverse("service:play-list")
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def upload_image_url(play_id: int):
+    return reverse("service:play-upload-image", args=[play_id])
+
+
+def image_file(width, height, image_format="PNG"):
+    file = BytesIO()
+    mode = "RGB" if image_format == "JPEG" else "RGBA"
+    Image.new(mode, (width, height), "red").save(file, image_format)
+    file.seek(0)
+    file.name = f"poster.{image_format.lower()}"
+    return file
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_WORKERS=0, IMAGE_VARIANT_WIDTHS=(320, 640, 1280))
+class PlayImageTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@gmail.com",
+            "test12345",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.play = Play.objects.create(title="Way", description="Film")
+
+    def upload(self, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(upload_image_url(self.play.id), {"image": file}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.play.refresh_from_db()
+
+    def test_upload_generates_variants(self):
+        self.upload(image_file(2000, 1000))
+
+        self.assertEqual(set(self.play.image_variants), {"webp", "jpeg"})
+        for image_format, names in self.play.image_variants.items():
+            self.assertEqual(list(names), ["320", "640", "1280"])
+            for width, name in names.items():
+                with default_storage.open(name) as file, Image.open(file) as image:
+                    self.assertEqual(image.format, image_format.upper())
+                    self.assertEqual(image.size, (int(width), int(width) // 2))
+
+    def test_small_image_is_not_enlarged(self):
+        self.upload(image_file(200, 100, "JPEG"))
+
+        self.assertEqual(list(self.play.image_variants["webp"]), ["200"])
+
+    def test_list_has_srcset(self):
+        # Cached before the upload, the list must not keep serving that
+        self.client.get(PLAY_URL)
+        self.upload(image_file(800, 400))
+
+        srcset = self.client.get(PLAY_URL).data[0]["image_srcset"]
+
+        names = self.play.image_variants["webp"]
+        self.assertEqual(
+            srcset["webp"],
+            f"http://testserver{default_storage.url(names['320'])} 320w, "
+            f"http://testserver{default_storage.url(names['640'])} 640w"
+        )
+
+    def test_new_upload_drops_old_variants(self):
+        self.upload(image_file(800, 400))
+        old_name = self.play.image.name
+
+        self.client.post(upload_image_url(self.play.id), {"image": image_file(900, 450)}, format="multipart")
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_variants, {})
+
+        # Variants of the replaced image finishing late are not stored
+        process_play_image(self.play.id, old_name)
+        self.play.refresh_from_db()
+        self.assertEqual(self.play.image_variants, {})
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.models import Play, Performance, TheatreHall
+from service.replicas import ReplicaRouter, reading_from
+
+PERFORMANCE_URL = reverse("service:performance-list")
+RESERVATION_URL = reverse("service:reservation-list")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    "replica" is a second connection to the test database, so what it
+    reads has to be committed; hence TransactionTestCase.
+    """
+    databases = {"default", "replica"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Way", description="Film"),
+            theatre_hall=TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5),
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19, 0))
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(primary), len(replica)
+
+    def test_get_reads_from_replica(self):
+        response, primary, replica = self.get(PERFORMANCE_URL)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_reads_stick_to_primary_after_write(self):
+        response = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"row": 1, "seat": 1, "performance": self.performance.id}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response, primary, replica = self.get(RESERVATION_URL)
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        cache.clear()
+        _, primary, replica = self.get(RESERVATION_URL)
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_failed_write_is_not_sticky(self):
+        response = self.client.post(RESERVATION_URL, {"tickets": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        _, primary, replica = self.get(RESERVATION_URL)
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_router(self):
+        router = ReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Play))
+        with reading_from("replica"):
+            self.assertEqual(router.db_for_read(Play), "replica")
+            self.assertEqual(router.db_for_write(Play), "default")
+
+            with transaction.atomic():
+                self.assertIsNone(router.db_for_read(Play))
+
+        self.assertTrue(router.allow_migrate("default", "service"))
+        self.assertFalse(router.allow_migrate("replica", "service"))
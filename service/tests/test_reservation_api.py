@@ -0,0 +1,153 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.models import Play, TheatreHall, Performance, Reservation, Ticket
+from service.serializers import ReservationSerializer
+
+RESERVATION_URL = reverse("service:reservation-list")
+
+
+def template_performance(**params):
+    play = Play.objects.create(title=params.pop("title", "Way"), description="Film")
+    theatre_hall = TheatreHall.objects.create(
+        name=params.pop("hall_name", "Blue"), rows=3, seats_in_row=5
+    )
+
+    default = {
+        "play": play,
+        "theatre_hall": theatre_hall,
+        "show_time": timezone.make_aware(datetime(2030, 1, 1, 19, 0)),
+    }
+    default.update(**params)
+
+    return Performance.objects.create(**default)
+
+
+def ticket_payload(performance, *seats):
+    return {
+        "tickets": [
+            {"row": row, "seat": seat, "performance": performance.id}
+            for row, seat in seats
+        ]
+    }
+
+
+class ReservationApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = template_performance()
+        self.other_performance = template_performance(title="Wolf", hall_name="Red")
+
+    def test_seat_sold_after_validation(self):
+        Ticket.objects.create(
+            row=1, seat=1, performance=self.performance, reservation=Reservation.objects.create(user=self.user)
+        )
+
+        with patch("service.booking.find_taken_seats", return_value=set()):
+            response = self.client.post(
+                RESERVATION_URL, ticket_payload(self.performance, (1, 1)), format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tickets", response.data)
+
+    def test_other_integrity_errors_are_not_reported_as_taken_seats(self):
+        serializer = ReservationSerializer(data=ticket_payload(self.performance, (1, 1)))
+        serializer.is_valid(raise_exception=True)
+
+        with patch("service.serializers.create_tickets", side_effect=IntegrityError("null value")):
+            with self.assertRaises(IntegrityError):
+                serializer.save(user=self.user)
+
+    def test_create_reservation(self):
+        payload = ticket_payload(self.performance, (1, 1), (1, 2))
+        payload["tickets"].append(
+            {"row": 3, "seat": 5, "performance": self.other_performance.id}
+        )
+
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["tickets"]), 3)
+        self.assertEqual(
+            Ticket.objects.filter(reservation__user=self.user).count(), 3
+        )
+
+    def test_create_reservation_query_count_does_not_grow_with_tickets(self):
+        payload = ticket_payload(
+            self.performance, *((row, seat) for row in (1, 2) for seat in range(1, 6))
+        )
+
+        # user lookup is skipped by force_authenticate; load performances,
+        # sold and held seat checks, savepoint pair, reservation, tickets,
+        # counter and listing updates and the tickets read back for the response
+        with self.assertNumQueries(10):
+            response = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_row_out_of_range(self):
+        response = self.client.post(
+            RESERVATION_URL, ticket_payload(self.performance, (4, 1)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["tickets"][0]["rows"], "row must be in range [1, 3], not 4"
+        )
+
+    def test_seat_out_of_range(self):
+        response = self.client.post(
+            RESERVATION_URL, ticket_payload(self.performance, (1, 6)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["tickets"][0]["seat"], "seat must be in range [1, 5], not 6"
+        )
+
+    def test_seat_already_taken(self):
+        self.client.post(
+            RESERVATION_URL, ticket_payload(self.performance, (1, 1)), format="json"
+        )
+
+        response = self.client.post(
+            RESERVATION_URL, ticket_payload(self.performance, (1, 2), (1, 1)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn("non_field_errors", response.data["tickets"][1])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_duplicate_seat_in_request(self):
+        response = self.client.post(
+            RESERVATION_URL, ticket_payload(self.performance, (1, 1), (1, 1)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data["tickets"][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_unknown_performance(self):
+        response = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"row": 1, "seat": 1, "performance": 0}]},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", response.data["tickets"][0])
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from service.benchmark import ClientTransport
+from service.loadtest import run_reservation_load
+from service.models import Performance, Play, TheatreHall
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """
+    Workers run in their own threads and connections, so the data they
+    compete for has to be committed; hence TransactionTestCase.
+    """
+
+    def setUp(self) -> None:
+        self.emails = [f"user{index}@gmail.com" for index in range(6)]
+        for email in self.emails:
+            get_user_model().objects.create_user(email, "test12345")
+
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet", description="Prince"),
+            theatre_hall=TheatreHall.objects.create(name="Blue", rows=2, seats_in_row=3),
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19, 0)),
+        )
+
+    def test_overlapping_reservations_never_double_sell(self):
+        with self.assertLogs("django.request", level="WARNING"):
+            results = run_reservation_load(
+                lambda index: ClientTransport(self.emails[index]),
+                self.performance,
+                workers=6,
+                requests_per_worker=5,
+                seats_per_request=2,
+                hot_seats=4,
+            )
+
+        self.assertEqual(results["requests"], 30)
+        self.assertEqual(results["errors"], 0)
+        self.assertGreater(results["conflicts"], 0)
+        self.assertEqual(results["double_sold"], [])
+        self.assertEqual(results["tickets_sold"], results["reserved"] * 2)
+        self.assertLessEqual(results["tickets_sold"], 4)
+        self.assertEqual(results["tickets_sold_counter"], results["tickets_sold"])
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.cache import catalogue_cache
+from service.models import Play, Actor
+
+PLAY_URL = reverse("service:play-list")
+ACTOR_URL = reverse("service:actor-list")
+
+
+class SearchApiTests(TestCase):
+    def setUp(self) -> None:
+        catalogue_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.hamlet = Play.objects.create(
+            title="Hamlet", description="The prince of Denmark seeks revenge"
+        )
+        self.lear = Play.objects.create(
+            title="King Lear", description="An old king divides his kingdom, Denmark is mentioned"
+        )
+        Play.objects.create(title="The Seagull", description="A young writer in love")
+
+    def test_search_vector_maintained_on_save(self):
+        self.hamlet.title = "Macbeth"
+        self.hamlet.save()
+
+        response = self.client.get(PLAY_URL, {"q": "macbeth"})
+
+        self.assertEqual([play["id"] for play in response.data["results"]], [self.hamlet.id])
+
+    def test_search_plays_ranked(self):
+        response = self.client.get(PLAY_URL, {"q": "denmark"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            {play["id"] for play in response.data["results"]},
+            {self.lear.id, self.hamlet.id}
+        )
+
+    def test_search_title_outranks_description(self):
+        Play.objects.create(title="Denmark", description="A play about a country")
+
+        response = self.client.get(PLAY_URL, {"q": "denmark"})
+
+        self.assertEqual(response.data["results"][0]["title"], "Denmark")
+
+    def test_search_plays_with_typo(self):
+        response = self.client.get(PLAY_URL, {"q": "Hamlett"})
+
+        self.assertEqual(
+            [play["id"] for play in response.data["results"]], [self.hamlet.id]
+        )
+
+    def test_list_without_search_is_not_paginated(self):
+        response = self.client.get(PLAY_URL)
+
+        self.assertEqual(len(response.data), 3)
+
+    def test_search_actors(self):
+        actor = Actor.objects.create(first_name="Oleg", last_name="Gordienko")
+        Actor.objects.create(first_name="John", last_name="Smith")
+
+        response = self.client.get(ACTOR_URL, {"q": "gordienko"})
+        self.assertEqual([item["id"] for item in response.data["results"]], [actor.id])
+
+        response = self.client.get(ACTOR_URL, {"q": "Gordienco"})
+        self.assertEqual([item["id"] for item in response.data["results"]], [actor.id])
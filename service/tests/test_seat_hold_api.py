@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from service.holds import _load_backend, get_hold_backend
+from service.models import Play, TheatreHall, Performance, Reservation, Ticket
+
+HOLD_URL = reverse("service:hold-list")
+RESERVATION_URL = reverse("service:reservation-list")
+
+
+def detail_hold(token):
+    return reverse("service:hold-detail", args=[token])
+
+
+def confirm_hold(token):
+    return reverse("service:hold-confirm", args=[token])
+
+
+def ticket_payload(performance, *seats):
+    return {
+        "tickets": [
+            {"row": row, "seat": seat, "performance": performance.id}
+            for row, seat in seats
+        ]
+    }
+
+
+class SeatHoldApiTestsMixin:
+    def setUp(self) -> None:
+        _load_backend.cache_clear()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Way", description="Film"),
+            theatre_hall=TheatreHall.objects.create(name="Blue", rows=3, seats_in_row=5),
+            show_time=timezone.make_aware(datetime(2030, 1, 1, 19, 0))
+        )
+
+    def hold(self, *seats, user=None):
+        self.client.force_authenticate(user or self.user)
+        response = self.client.post(HOLD_URL, ticket_payload(self.performance, *seats), format="json")
+        self.client.force_authenticate(self.user)
+        return response
+
+    def test_hold_seats(self):
+        response = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["tickets"]), 2)
+
+        response = self.client.get(detail_hold(response.data["token"]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["tickets"][0],
+            {"row": 1, "seat": 1, "performance": self.performance.id}
+        )
+
+    def test_held_seats_cannot_be_held_by_others(self):
+        self.hold((1, 1))
+
+        response = self.hold((1, 2), (1, 1), user=self.other_user)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["seats"], [{"performance": self.performance.id, "row": 1, "seat": 1}]
+        )
+
+    def test_held_seats_cannot_be_reserved_by_others(self):
+        self.hold((1, 1))
+        self.client.force_authenticate(self.other_user)
+
+        response = self.client.post(
+            RESERVATION_URL, ticket_payload(self.performance, (1, 1)), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_confirm_hold(self):
+        token = self.hold((1, 1), (2, 2)).data["token"]
+
+        response = self.client.post(confirm_hold(token))
+        self.performance.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Ticket.objects.filter(reservation_id=response.data["id"]).count(), 2
+        )
+        self.assertEqual(self.performance.tickets_sold, 2)
+        self.assertEqual(
+            self.client.get(detail_hold(token)).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_confirm_hold_of_seat_sold_meanwhile(self):
+        token = self.hold((1, 1)).data["token"]
+        Ticket.objects.create(
+            row=1, seat=1, performance=self.performance,
+            reservation=Reservation.objects.create(user=self.other_user)
+        )
+
+        response = self.client.post(confirm_hold(token))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_cannot_confirm_hold_of_other_user(self):
+        token = self.hold((1, 1), user=self.other_user).data["token"]
+
+        response = self.client.post(confirm_hold(token))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_release_hold(self):
+        token = self.hold((1, 1)).data["token"]
+
+        response = self.client.delete(detail_hold(token))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.hold((1, 1), user=self.other_user).status_code, status.HTTP_201_CREATED)
+
+    def test_expired_hold_is_reclaimed(self):
+        with override_settings(SEAT_HOLD_TTL=timedelta(seconds=-1)):
+            token = self.hold((1, 1)).data["token"]
+
+        self.assertEqual(self.hold((1, 1), user=self.other_user).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.client.post(confirm_hold(token)).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_purge_seat_holds(self):
+        with override_settings(SEAT_HOLD_TTL=timedelta(seconds=-1)):
+            self.hold((1, 1))
+        self.hold((1, 2))
+
+        call_command("purge_seat_holds", stdout=StringIO())
+
+        self.assertEqual(get_hold_backend().purge_expired(), 0)
+        self.assertEqual(
+            get_hold_backend().held_seats([(self.performance.id, 1, 2)], exclude_user_id=None),
+            {(self.performance.id, 1, 2)}
+        )
+
+    def test_cannot_hold_sold_seat(self):
+        self.client.post(RESERVATION_URL, ticket_payload(self.performance, (1, 1)), format="json")
+
+        response = self.hold((1, 1), user=self.other_user)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DatabaseSeatHoldApiTests(SeatHoldApiTestsMixin, TestCase):
+    pass
+
+
+@override_settings(SEAT_HOLD_BACKEND="service.holds.InMemorySeatHoldBackend")
+class InMemorySeatHoldApiTests(SeatHoldApiTestsMixin, TestCase):
+    pass
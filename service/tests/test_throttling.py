@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from service.throttling import ReservationRateThrottle, SlidingWindowUserThrottle, local_tier
+
+RESERVATION_URL = reverse("service:reservation-list")
+
+
+class MinuteThrottle(SlidingWindowUserThrottle):
+    rate = "10/min"
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        local_tier.clear()
+        self.request = Request(APIRequestFactory().get("/"))
+        self.request.user = get_user_model()(pk=1)
+        # Start of a window
+        self.now = 600.0
+
+    def allowed(self, times):
+        throttle = MinuteThrottle()
+        throttle.timer = lambda: self.now
+        return [throttle.allow_request(self.request, None) for _ in range(times)], throttle
+
+    def test_refuses_over_rate(self):
+        results, throttle = self.allowed(11)
+
+        self.assertEqual(results, [True] * 10 + [False])
+        # Until this window slid out far enough for one request
+        self.assertAlmostEqual(throttle.wait(), 60 + 6)
+
+    def test_previous_window_slides_out(self):
+        self.allowed(10)
+        local_tier.clear()
+
+        self.now += 60 + 30
+        results, _ = self.allowed(6)
+
+        self.assertEqual(results, [True] * 5 + [False])
+
+    def test_refused_client_stays_refused_locally(self):
+        self.allowed(11)
+        cache.clear()
+
+        results, throttle = self.allowed(1)
+        self.assertEqual(results, [False])
+        self.assertAlmostEqual(throttle.wait(), 66)
+
+        self.now += 66
+        results, _ = self.allowed(1)
+        self.assertEqual(results, [True])
+
+    def test_refused_requests_are_not_counted(self):
+        self.allowed(20)
+        local_tier.clear()
+
+        # A tenth of the 10 counted requests is still in the sliding window
+        self.now += 60 + 54
+        results, _ = self.allowed(10)
+
+        self.assertEqual(results, [True] * 9 + [False])
+
+
+class ReservationThrottleTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        local_tier.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@gmail.com",
+            "test12345"
+        )
+        self.client.force_authenticate(self.user)
+
+    @patch.dict(ReservationRateThrottle.THROTTLE_RATES, {"reservations": "2/min"})
+    def test_creating_reservations_is_throttled(self):
+        for _ in range(2):
+            response = self.client.post(RESERVATION_URL, {"tickets": []}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(RESERVATION_URL, {"tickets": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        self.assertEqual(self.client.get(RESERVATION_URL).status_code, status.HTTP_200_OK)
@@ -0,0 +1,149 @@
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+# What a process remembers about a client during one window
+LocalState = namedtuple("LocalState", ("window", "previous", "blocked_until"))
+
+
+class LocalTier:
+    """
+    Per-process memory in front of the shared cache: the count of the
+    previous window, which no longer changes, and until when a refused
+    client stays refused. It only spares cache calls, the counts that
+    decide live in the cache shared by all processes.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, window):
+        state = self.states.get(key)
+        if state is None or state.window != window:
+            return None
+
+        return state
+
+    def set(self, key, state):
+        with self.lock:
+            if len(self.states) >= self.max_entries and key not in self.states:
+                # Mostly states of past windows, which are of no use
+                self.states.clear()
+            self.states[key] = state
+
+    def clear(self):
+        with self.lock:
+            self.states.clear()
+
+
+local_tier = LocalTier()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with a sliding-window counter instead of a list of
+    request timestamps.
+
+    Requests are counted per fixed window of the rate's duration; a request
+    is allowed while the count of the current window plus the count of the
+    previous one, weighted by how much of it still overlaps the sliding
+    window, stays within the rate. That is two integers per client in
+    THROTTLE_CACHE, and one atomic incr() per allowed request once the
+    previous count is in the local tier, instead of reading and writing
+    the whole history.
+    """
+    cache_format = "throttle:%(scope)s:%(ident)s"
+    local = local_tier
+
+    def __init__(self):
+        super().__init__()
+        self.cache = caches[settings.THROTTLE_CACHE]
+        self.remaining = None
+
+    def window_key(self, window):
+        return f"{self.key}:{window}"
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Kept for two windows, as the previous one of the next window
+            if self.cache.add(key, 1, self.duration * 2):
+                return 1
+            # Another process added it first
+            return self.cache.incr(key)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now / self.duration, 1)
+        window = int(window)
+
+        state = self.local.get(self.key, window)
+        if state is not None and state.blocked_until > self.now:
+            self.remaining = state.blocked_until - self.now
+            return False
+        if state is None:
+            state = LocalState(window, self.cache.get(self.window_key(window - 1), 0), 0)
+            self.local.set(self.key, state)
+
+        self.previous = state.previous
+        self.current = self.increment(self.window_key(window))
+        if self.previous * (1 - self.elapsed) + self.current <= self.num_requests:
+            return True
+
+        # Refused requests are not counted, as with SimpleRateThrottle
+        try:
+            self.cache.decr(self.window_key(window))
+        except ValueError:
+            pass
+        self.current -= 1
+        self.remaining = self.seconds_until_allowed()
+        self.local.set(self.key, state._replace(blocked_until=self.now + self.remaining))
+        return False
+
+    def seconds_until_allowed(self):
+        """When the next request fits, if the client makes none meanwhile."""
+        room = self.num_requests - self.current - 1
+        if room >= 0:
+            # Enough of the previous window has to slide out
+            fraction = 1 - room / self.previous
+        else:
+            # This window has to slide out in the next one
+            fraction = 2 - (self.num_requests - 1) / self.current
+
+        return max(0.0, (fraction - self.elapsed) * self.duration)
+
+    def wait(self):
+        return self.remaining
+
+
+class SlidingWindowAnonThrottle(SlidingWindowThrottle, AnonRateThrottle):
+    pass
+
+
+class SlidingWindowUserThrottle(SlidingWindowThrottle, UserRateThrottle):
+    pass
+
+
+class ReservationRateThrottle(SlidingWindowUserThrottle):
+    """Stricter rate for making reservations, on top of the user rate."""
+    scope = "reservations"
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+
+        return super().allow_request(request, view)
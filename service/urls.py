@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from service import async_views
 from service.views import (
     ActorModelViewSet,
     GenreModelViewSet,
@@ -8,7 +9,10 @@ from service.views import (
     PerformanceModelViewSet,
     TheatreHallModelViewSet,
     TicketModelView,
-    ReservationModelView
+    ReservationModelView,
+    SeatHoldViewSet,
+    RequestMetricsView,
+    ExportView
 )
 
 # use router for all paths
@@ -18,12 +22,23 @@ router.register("genres", GenreModelViewSet)
 router.register("plays", PlayModelViewSet)
 router.register("theaters", TheatreHallModelViewSet)
 router.register("performances", PerformanceModelViewSet)
+router.register("tickets", TicketModelView)
 router.register("reservations", ReservationModelView)
+router.register("holds", SeatHoldViewSet, basename="hold")
 
 
 # add router to url
 urlpatterns = [
-    path("", include(router.urls), )
+    path("", include(router.urls), ),
+    path("metrics/", RequestMetricsView.as_view(), name="metrics"),
+    path("exports/<slug:dataset>.<slug:export_format>", ExportView.as_view(), name="export"),
+    path("async/plays/", async_views.play_list, name="async-play-list"),
+    path("async/performances/", async_views.performance_list, name="async-performance-list"),
+    path(
+        "async/performances/<int:pk>/seat-map/",
+        async_views.performance_seat_map,
+        name="async-performance-seat-map",
+    ),
 ]
 
 app_name = "service"
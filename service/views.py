@@ -1,13 +1,56 @@
-from django.db.models import Count, F
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
-
-from service.models import Actor, Genre, Play, Performance, TheatreHall, Ticket, Reservation
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from service.booking import create_tickets, is_seat_taken
+from service.cache import CachedCatalogueMixin
+from service.conditional import ConditionalGetMixin
+from service.exports import EXPORTS, EXPORT_FORMATS, ExportContentNegotiation, stream_export
+from service.filters import (
+    filter_by_related,
+    filter_performances,
+    parse_datetime_param,
+    parse_ids,
+    parse_mode,
+)
+from service.holds import get_hold_backend, SeatsUnavailable
+from service.images import save_play
+from service.listings import LISTING_FIELDS, listing_data, refresh_listings
+from service.middleware import request_metrics
+from service.models import (
+    Actor,
+    Genre,
+    Play,
+    Performance,
+    PerformanceListing,
+    TheatreHall,
+    Ticket,
+    Reservation,
+)
+from service.replicas import ReplicaReadMixin
+from service.scheduling import (
+    DOUBLE_BOOKING_MESSAGE,
+    MAX_FREE_SLOTS_WINDOW,
+    free_slots,
+    is_double_booking,
+    schedule,
+)
+from service.search import search, SearchPagination, PLAY_SEARCH_CONFIG, ACTOR_SEARCH_CONFIG
+from service.seat_map import performance_seat_bitmap
+from service.throttling import ReservationRateThrottle
 from service.serializers import (
     ActorSerializer,
     GenreSerializer,
@@ -18,52 +61,118 @@ from service.serializers import (
     PerformanceSerializer,
     PerformanceListSerializer,
     PerformanceDetailSerializer,
+    PerformanceDetailSeatMapSerializer,
+    PerformanceSeatMapSerializer,
+    PerformanceBulkItemSerializer,
+    PerformanceRecurrenceSerializer,
     TheatreHallSerializer,
     TicketSerializer,
     TicketListSerializer,
     ReservationSerializer,
-    ReservationDetailSerializer
+    ReservationDetailSerializer,
+    SeatHoldSerializer,
+    FreeSlotSerializer
 )
+from user.authentication import ClaimsJWTAuthentication
 from user.permissions import IsAdminOrIfAuthenticatedReadOnly
 
 
-class ActorModelViewSet(viewsets.ModelViewSet):
+class PerformancePagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("show_time", "id")
+
+
+class TicketPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("id",)
+
+
+class ReservationPagination(CursorPagination):
+    page_size = 2
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class ActorModelViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedCatalogueMixin, viewsets.ModelViewSet):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
-    authentication_classes = (JWTAuthentication, )
+    authentication_classes = (ClaimsJWTAuthentication, )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_groups = ("actors",)
+    stamp_fields = ("updated_at",)
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
 
+        text = self.request.query_params.get("q")
+        if text:
+            queryset = search(queryset, text, ACTOR_SEARCH_CONFIG, ("first_name", "last_name"))
 
-class GenreModelViewSet(viewsets.ModelViewSet):
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=str,
+                description="Search by name; results are ranked and paginated"
+            )
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class GenreModelViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedCatalogueMixin, viewsets.ModelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    authentication_classes = (JWTAuthentication, )
+    authentication_classes = (ClaimsJWTAuthentication, )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_groups = ("genres",)
+    stamp_fields = ("updated_at",)
 
 
-class PlayModelViewSet(viewsets.ModelViewSet):
+class PlayModelViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedCatalogueMixin, viewsets.ModelViewSet):
     queryset = Play.objects.all().prefetch_related("actors", "genres")
     serializer_class = PlaySerializer
-    authentication_classes = (JWTAuthentication, )
+    authentication_classes = (ClaimsJWTAuthentication, )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
-
-    @staticmethod
-    def _params_to_ints(query):
-        return [int(str_id) for str_id in query.split(",")]
+    cache_groups = ("plays", "actors", "genres")
+    stamp_fields = ("updated_at",)
+    pagination_class = SearchPagination
 
     def get_queryset(self):
-        queryset = self.queryset
-
-        actors = self.request.query_params.get("actors")
-        genres = self.request.query_params.get("genres")
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        if params.get("actors"):
+            queryset = filter_by_related(
+                queryset,
+                Play.actors.through,
+                "play_id",
+                "actor_id",
+                parse_ids(params["actors"], "actors"),
+                parse_mode(params.get("actors_mode"), "actors_mode")
+            )
 
-        if actors:
-            actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__id__in=actors_ids)
+        if params.get("genres"):
+            queryset = filter_by_related(
+                queryset,
+                Play.genres.through,
+                "play_id",
+                "genre_id",
+                parse_ids(params["genres"], "genres"),
+                parse_mode(params.get("genres_mode"), "genres_mode")
+            )
 
-        if genres:
-            genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
+        if params.get("q"):
+            queryset = search(queryset, params["q"], PLAY_SEARCH_CONFIG, ("title",))
 
         return queryset
 
@@ -72,6 +181,27 @@ class PlayModelViewSet(viewsets.ModelViewSet):
             OpenApiParameter(
                 "actors",
                 type={"type": "list", "items": {"type": "number"}}
+            ),
+            OpenApiParameter(
+                "actors_mode",
+                type=str,
+                enum=["any", "all"],
+                description="Match plays with any (default) or all of the given actors"
+            ),
+            OpenApiParameter(
+                "genres",
+                type={"type": "list", "items": {"type": "number"}}
+            ),
+            OpenApiParameter(
+                "genres_mode",
+                type=str,
+                enum=["any", "all"],
+                description="Match plays with any (default) or all of the given genres"
+            ),
+            OpenApiParameter(
+                "q",
+                type=str,
+                description="Search by title and description; results are ranked and paginated"
             )
         ]
     )
@@ -90,59 +220,248 @@ class PlayModelViewSet(viewsets.ModelViewSet):
 
         return PlaySerializer
 
+    def perform_create(self, serializer):
+        save_play(serializer)
+
+    def perform_update(self, serializer):
+        save_play(serializer)
+
     @action(methods=["POST"], detail=True, url_path="upload-image", permission_classes=[IsAdminUser])
     def upload_image(self, request, pk=None):
         play = self.get_object()
         serializer = self.get_serializer(play, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            save_play(serializer)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PerformanceModelViewSet(viewsets.ModelViewSet):
+class PerformanceModelViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Performance.objects.all().select_related("play", "theatre_hall")
     serializer_class = PerformanceSerializer
-    authentication_classes = (JWTAuthentication, )
+    authentication_classes = (ClaimsJWTAuthentication, )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = PerformancePagination
+
+    @property
+    def stamp_fields(self):
+        if self.action == "list":
+            return ("refreshed_at",)
+
+        return ("updated_at", "play__updated_at", "theatre_hall__updated_at")
+
+    def get_queryset(self):
+        if self.action != "list":
+            return super().get_queryset()
+
+        return filter_performances(
+            PerformanceListing.objects.values(*LISTING_FIELDS), self.request.query_params
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                description="Performances on this day"
+            ),
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATETIME,
+                description="Performances starting at or after this time, defaults to now"
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATETIME,
+                description="Performances starting before this time"
+            ),
+            OpenApiParameter(
+                "play",
+                type={"type": "list", "items": {"type": "number"}}
+            ),
+            OpenApiParameter(
+                "hall",
+                type={"type": "list", "items": {"type": "number"}}
+            ),
+            OpenApiParameter(
+                "available_only",
+                type=bool,
+                description="Only performances with unsold seats"
+            )
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(self.list_listings, request, *args, **kwargs)
+
+    def list_listings(self, request, *args, **kwargs):
+        # Rows of the read model are turned into dicts directly,
+        # PerformanceListSerializer only documents their shape
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.get_paginated_response([listing_data(row) for row in page])
 
     def get_serializer_class(self):
         if self.action == "list":
             return PerformanceListSerializer
         elif self.action == "retrieve":
+            if self.request.query_params.get("seat_map") == "true":
+                return PerformanceDetailSeatMapSerializer
+
             return PerformanceDetailSerializer
+        elif self.action == "seat_map":
+            return PerformanceSeatMapSerializer
 
         return PerformanceSerializer
 
-    def get_queryset(self):
-        queryset = self.queryset
-
-        if self.action == "list":
-            queryset = (
-                queryset
-                .select_related("theatre_hall")
-                .annotate(
-                    tickets_available=F("theatre_hall__rows") * F("theatre_hall__seats_in_row") - Count("tickets")
-                ).order_by("id")
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "seat_map",
+                type=bool,
+                description="Return seat occupancy as a base64 bitmap instead of the ticket list"
             )
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
-        return queryset
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=str,
+                enum=["base64", "raw"],
+                description="raw returns the bitmap as application/octet-stream"
+            )
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        performance = self.get_object()
+
+        if request.query_params.get("encoding") == "raw":
+            response = HttpResponse(
+                performance_seat_bitmap(performance),
+                content_type="application/octet-stream"
+            )
+            response["X-Seat-Map-Rows"] = performance.theatre_hall.rows
+            response["X-Seat-Map-Seats-In-Row"] = performance.theatre_hall.seats_in_row
+            return response
 
+        serializer = self.get_serializer(performance)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-class TheatreHallModelViewSet(viewsets.ModelViewSet):
+    @extend_schema(
+        request=PerformanceRecurrenceSerializer,
+        responses={201: PerformanceSerializer(many=True)},
+        description=(
+            "Create many performances in one transaction, from either a list of "
+            "{play, theatre_hall, show_time} or a recurrence rule."
+        ),
+    )
+    @action(methods=["POST"], detail=False, url_path="bulk", permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        if isinstance(request.data, list):
+            serializer = PerformanceBulkItemSerializer(data=request.data, many=True, allow_empty=False)
+            serializer.is_valid(raise_exception=True)
+            performances_data = serializer.validated_data
+        else:
+            serializer = PerformanceRecurrenceSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            performances_data = serializer.get_performances_data()
+
+        try:
+            with transaction.atomic():
+                errors, performances = schedule(performances_data)
+                if any(errors):
+                    raise ValidationError(errors)
+
+                Performance.objects.bulk_create(performances)
+                refresh_listings([performance.id for performance in performances])
+        except IntegrityError as error:
+            if not is_double_booking(error):
+                raise
+            # Booked meanwhile by a writer that does not lock the hall
+            raise ValidationError({"show_time": [DOUBLE_BOOKING_MESSAGE]})
+
+        return Response(
+            PerformanceSerializer(performances, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class TheatreHallModelViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedCatalogueMixin, viewsets.ModelViewSet):
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
-    authentication_classes = (JWTAuthentication, )
+    authentication_classes = (ClaimsJWTAuthentication, )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_groups = ("theatre_halls",)
+    stamp_fields = ("updated_at",)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATETIME,
+                description="Start of the window, now by default",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATETIME,
+                description="End of the window, a week after from by default",
+            ),
+            OpenApiParameter(
+                "min_duration",
+                type=int,
+                description="Only gaps of at least this many minutes",
+            ),
+        ],
+        responses=FreeSlotSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=True, url_path="free-slots")
+    def free_slots(self, request, pk=None):
+        theatre_hall = self.get_object()
+
+        start = parse_datetime_param(request.query_params.get("from"), "from") or timezone.now()
+        end = (
+            parse_datetime_param(request.query_params.get("to"), "to")
+            or start + timedelta(days=7)
+        )
+        if not start < end <= start + MAX_FREE_SLOTS_WINDOW:
+            raise ValidationError(
+                {"to": [f"Must be after from and at most {MAX_FREE_SLOTS_WINDOW.days} days later."]}
+            )
+
+        min_duration = request.query_params.get("min_duration", "0")
+        if not min_duration.isdigit():
+            raise ValidationError({"min_duration": ["Expected a number of minutes."]})
 
+        slots = free_slots(theatre_hall.id, start, end, timedelta(minutes=int(min_duration)))
+        serializer = FreeSlotSerializer(
+            [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots], many=True
+        )
+        return Response(serializer.data)
 
-class TicketModelView(viewsets.ModelViewSet):
-    queryset = Ticket.objects.all().select_related("performance")
+
+class TicketModelView(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Tickets of the user's reservations, of all reservations for admins.
+    Tickets are only made through reservations.
+    """
+    queryset = Ticket.objects.all().select_related(
+        "performance__play", "performance__theatre_hall"
+    )
     serializer_class = TicketSerializer
-    authentication_classes = (JWTAuthentication, )
-    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    authentication_classes = (ClaimsJWTAuthentication, )
+    permission_classes = (IsAuthenticated,)
+    pagination_class = TicketPagination
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return self.queryset
+
+        return self.queryset.filter(reservation__user_id=self.request.user.id)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -151,19 +470,14 @@ class TicketModelView(viewsets.ModelViewSet):
         return TicketSerializer
 
 
-class ReservationPagination(PageNumberPagination):
-    page_size = 2
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
-class ReservationModelView(viewsets.ModelViewSet):
+class ReservationModelView(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Reservation.objects.all().prefetch_related("tickets__performance")
     serializer_class = ReservationSerializer
     pagination_class = ReservationPagination
+    throttle_classes = (*api_settings.DEFAULT_THROTTLE_CLASSES, ReservationRateThrottle)
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.id)
 
     def get_serializer_class(self):
 
@@ -173,4 +487,123 @@ class ReservationModelView(viewsets.ModelViewSet):
         return ReservationSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
+
+
+class SeatHoldViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    Temporary claims on seats that are turned into a reservation on confirm.
+    """
+    serializer_class = SeatHoldSerializer
+    authentication_classes = (ClaimsJWTAuthentication, )
+    permission_classes = (IsAuthenticated,)
+    lookup_field = "token"
+    lookup_value_regex = "[0-9a-f-]{36}"
+
+    def _get_hold(self, token):
+        hold = get_hold_backend().get(token, self.request.user.id)
+
+        if hold is None:
+            raise NotFound("Seat hold does not exist or has expired.")
+
+        return hold
+
+    def create(self, request):
+        serializer = SeatHoldSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            hold = get_hold_backend().claim(
+                request.user.id, serializer.validated_data["tickets"], settings.SEAT_HOLD_TTL
+            )
+        except SeatsUnavailable as error:
+            return Response(
+                {
+                    "detail": "Some seats are held by another customer.",
+                    "seats": [
+                        {"performance": performance_id, "row": row, "seat": seat}
+                        for performance_id, row, seat in sorted(error.seats)
+                    ]
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response(SeatHoldSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, token=None):
+        return Response(SeatHoldSerializer(self._get_hold(token)).data)
+
+    def destroy(self, request, token=None):
+        get_hold_backend().release(self._get_hold(token).token)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(request=None, responses=ReservationSerializer)
+    @action(methods=["POST"], detail=True)
+    def confirm(self, request, token=None):
+        hold = self._get_hold(token)
+
+        try:
+            with transaction.atomic():
+                reservation = Reservation.objects.create(user_id=request.user.id)
+                create_tickets(reservation, hold.tickets)
+                get_hold_backend().release(hold.token)
+        except IntegrityError as error:
+            if not is_seat_taken(error):
+                raise
+            return Response(
+                {"detail": "Some of the held seats have already been sold."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response(ReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
+
+
+class RequestMetricsView(APIView):
+    """Per-view query counts and timings collected by this process."""
+    authentication_classes = (ClaimsJWTAuthentication, )
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(request_metrics.snapshot())
+
+    def delete(self, request):
+        request_metrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ExportView(APIView):
+    """
+    Stream tickets, reservations or performance sales as CSV or NDJSON.
+
+    Rows are read as values() dicts through a server-side cursor, so the
+    export runs in constant memory however large the table is.
+    """
+    authentication_classes = (ClaimsJWTAuthentication, )
+    permission_classes = (IsAdminUser,)
+    content_negotiation_class = ExportContentNegotiation
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "performances",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Only tickets or sales of these performances (ex. ?performances=1,2)",
+            ),
+            OpenApiParameter(
+                "plays",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Only sales of these plays (ex. ?plays=1,2)",
+            ),
+        ]
+    )
+    def get(self, request, dataset, export_format):
+        if dataset not in EXPORTS or export_format not in EXPORT_FORMATS:
+            raise NotFound(f"Unknown export {dataset}.{export_format}.")
+
+        queryset = EXPORTS[dataset](request.query_params)
+        _, content_type = EXPORT_FORMATS[export_format]
+        filename = f"{dataset}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+
+        response = StreamingHttpResponse(stream_export(queryset, export_format), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
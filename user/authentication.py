@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# User fields copied into tokens, and checked against the user on each request
+CLAIM_FIELDS = ("is_active", "is_staff")
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying CLAIM_FIELDS, which its access tokens copy."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """request.user built from a token instead of a user_user row."""
+
+    def __init__(self, token, state):
+        super().__init__(token)
+        self.is_active, self.is_staff = state
+
+
+def state_cache_key(user_id):
+    return f"user-state:{user_id}"
+
+
+def user_state_query(user_id):
+    return get_user_model().objects.filter(
+        **{api_settings.USER_ID_FIELD: user_id}
+    ).values_list(*CLAIM_FIELDS)
+
+
+def forget_user_state(user_id):
+    caches[settings.USER_STATE_CACHE].delete(state_cache_key(user_id))
+
+
+def check_user_state(token, state):
+    """
+    Reject tokens of deleted or inactive users, and tokens whose claims no
+    longer match the user; those users have to log in again.
+    """
+    if not state or not state[0]:
+        raise AuthenticationFailed("User not found or inactive", code="user_inactive")
+
+    claims = tuple(token.get(field, value) for field, value in zip(CLAIM_FIELDS, state))
+    if claims != tuple(state):
+        raise InvalidToken("Token claims are outdated, log in again")
+
+    return ClaimsUser(token, state)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without a user_user lookup per request.
+
+    The user is built from the token, after checking it against the user's
+    is_active and is_staff cached for USER_STATE_TTL, so a user who is
+    deactivated or loses staff rights is locked out within that time, or at
+    once in processes sharing USER_STATE_CACHE with the one that saved them.
+    Tokens issued before the claims were added take both from the cache.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        cache = caches[settings.USER_STATE_CACHE]
+
+        state = cache.get(state_cache_key(user_id))
+        if state is None:
+            # () remembers a deleted user
+            state = user_state_query(user_id).first() or ()
+            cache.set(state_cache_key(user_id), state, settings.USER_STATE_TTL.total_seconds())
+
+        return check_user_state(validated_token, state)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        cache = caches[settings.USER_STATE_CACHE]
+
+        state = await cache.aget(state_cache_key(user_id))
+        if state is None:
+            state = await user_state_query(user_id).afirst() or ()
+            await cache.aset(state_cache_key(user_id), state, settings.USER_STATE_TTL.total_seconds())
+
+        return check_user_state(validated_token, state)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
@@ -2,6 +2,9 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from django.utils.translation import gettext as _
 from rest_framework.authentication import authenticate
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from user.authentication import ClaimsRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -50,3 +53,7 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken